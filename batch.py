@@ -0,0 +1,142 @@
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import concurrency
+
+
+def read_companies(path):
+    """Read company names from a CSV (``company`` column, else the first column) or JSONL file."""
+    companies = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                companies.append(record["company"] if isinstance(record, dict) else str(record))
+        else:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+            if rows and "company" in [c.strip().lower() for c in rows[0]]:
+                column = [c.strip().lower() for c in rows[0]].index("company")
+                rows = rows[1:]
+            else:
+                column = 0
+            companies = [row[column] for row in rows]
+    # Keep the first occurrence of each company
+    unique, seen = [], set()
+    for company in companies:
+        company = company.strip()
+        if company and company.lower() not in seen:
+            seen.add(company.lower())
+            unique.append(company)
+    return unique
+
+
+def slugify(company):
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
+
+
+def report_names(companies):
+    """File name stem per company: its slug, plus a hash of the exact name when an
+    earlier company in the list has the same slug (e.g. "Acme, Inc." and "Acme Inc").
+    """
+    names, taken = {}, set()
+    for company in companies:
+        name = slugify(company)
+        if name in taken:
+            name = f"{name}-{hashlib.sha1(company.encode('utf-8')).hexdigest()[:8]}"
+        taken.add(name)
+        names[company] = name
+    return names
+
+
+def load_manifest(output_dir):
+    """Latest manifest entry per company, used to resume an interrupted batch."""
+    entries = {}
+    path = os.path.join(output_dir, "manifest.jsonl")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["company"]] = entry
+    return entries
+
+
+def _init_worker(semaphores):
+    concurrency.install(semaphores)
+
+
+def _analyze_one(analyze, company, output_dir, report_ext=".md", report_name=None):
+    started = time.time()
+    entry = {"company": company, "started_at": datetime.now(timezone.utc).isoformat()}
+    try:
+        report = analyze(company)
+        report_path = os.path.join(output_dir, "reports", (report_name or slugify(company)) + report_ext)
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(str(report))
+        entry.update(status="ok", report=report_path)
+    except Exception as e:
+        entry.update(status="error", error=f"{type(e).__name__}: {e}")
+    entry["wall_time"] = round(time.time() - started, 2)
+    return entry
+
+
+def run_batch(companies, analyze, output_dir, workers=2, executor="thread",
+              llm_concurrency=None, search_concurrency=None, resume=True, report_ext=".md"):
+    """Analyze ``companies`` concurrently, writing one report each plus a manifest.
+
+    ``analyze(company)`` must return the report. Each finished company is appended to
+    ``manifest.jsonl`` straight away, so re-running with ``resume`` skips companies
+    that already completed. ``llm_concurrency`` and ``search_concurrency`` bound the
+    number of simultaneous LLM generations and search API calls independently of the
+    number of workers. ``executor="process"`` runs each company in its own process.
+    Reports are saved as ``reports/<company-slug><report_ext>``; see ``report_names``
+    for companies whose names slugify the same.
+    """
+    os.makedirs(os.path.join(output_dir, "reports"), exist_ok=True)
+    previous = load_manifest(output_dir) if resume else {}
+    pending = [c for c in companies if previous.get(c, {}).get("status") != "ok"]
+    skipped = len(companies) - len(pending)
+    if skipped:
+        print(f"Resuming batch: {skipped} of {len(companies)} companies already done")
+
+    if executor == "process":
+        semaphores = {name: multiprocessing.BoundedSemaphore(n)
+                      for name, n in (("llm", llm_concurrency), ("search", search_concurrency)) if n}
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(semaphores,))
+    else:
+        concurrency.configure("llm", llm_concurrency)
+        concurrency.configure("search", search_concurrency)
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    manifest_path = os.path.join(output_dir, "manifest.jsonl")
+    results = {c: previous[c] for c in companies if c in previous}
+    with pool, open(manifest_path, "a", encoding="utf-8") as manifest:
+        names = report_names(companies)
+        futures = {pool.submit(_analyze_one, analyze, c, output_dir, report_ext, names[c]): c for c in pending}
+        for future in as_completed(futures):
+            entry = future.result()
+            results[entry["company"]] = entry
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            print(f"[{entry['status']}] {entry['company']} in {entry['wall_time']}s")
+
+    summary = {
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "total": len(companies),
+        "ok": sum(1 for e in results.values() if e.get("status") == "ok"),
+        "failed": sum(1 for e in results.values() if e.get("status") == "error"),
+        "companies": [results[c] for c in companies if c in results],
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from crews import CREWS, load_script
+from fake_services import FakeExa, FakeOllama, FakeSerper
+
+
+def rss():
+    """Resident set size of this process in bytes (peak so far where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+class PeakRss:
+    """Samples RSS on a background thread while the block runs; ``peak`` is the highest seen.
+
+    Unlike tracemalloc it doesn't hook every allocation, so it doesn't slow the timed run.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, rss())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.peak = rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_benchmark(crews, company, args):
+    exa = FakeExa(latency=args.search_latency, num_results=args.num_results, content_chars=args.content_chars)
+    serper = FakeSerper(latency=args.search_latency, num_results=args.num_results)
+    ollama = FakeOllama(latency=args.llm_latency, token_latency=args.token_latency,
+                        answer_chars=args.answer_chars, tool_calls_per_agent=args.tool_calls)
+    cache_dir = tempfile.mkdtemp(prefix="osint-bench-")
+    os.environ.update({
+        "EXA_API_KEY": "benchmark",
+        "SERPER_API_KEY": "benchmark",
+        "EXA_BASE_URL": exa.url,
+        "SERPER_URL": serper.url + "/search",
+        "OLLAMA_BASE_URL": ollama.url,
+        # Benchmark runs stay out of the real run history, warehouse, document store and rate limits
+        "CHECKPOINT_DIR": os.path.join(cache_dir, "runs"),
+        "WAREHOUSE_PATH": os.path.join(cache_dir, "warehouse.sqlite"),
+        "DOC_STORE_PATH": os.path.join(cache_dir, "documents.sqlite"),
+        "RATE_LIMIT_DIR": os.path.join(cache_dir, "ratelimit"),
+    })
+    if not args.warm_cache:
+        # Fresh caches so every run measures the same amount of work
+        os.environ["SEARCH_CACHE_PATH"] = os.path.join(cache_dir, "search.sqlite")
+        os.environ["LLM_CACHE_PATH"] = os.path.join(cache_dir, "llm.sqlite")
+
+    results = []
+    try:
+        for crew in crews:
+            module = load_script(f"{crew}_agent", CREWS[crew])
+            for run in range(args.runs):
+                for service in (exa, serper, ollama):
+                    service.calls.clear()
+                ollama.agent_time.clear()
+                ollama.agent_calls.clear()
+                status = "ok"
+                with PeakRss() as memory:
+                    started = time.perf_counter()
+                    try:
+                        module.run_analysis(company)
+                    except Exception as e:
+                        status = f"error: {type(e).__name__}: {e}"
+                    wall_time = time.perf_counter() - started
+                results.append({
+                    "crew": crew,
+                    "run": run + 1,
+                    "status": status,
+                    "wall_time_s": round(wall_time, 3),
+                    "peak_rss_mb": round(memory.peak / 2**20, 2),
+                    "llm_calls": ollama.calls["/api/generate"],
+                    "tool_calls": {**{f"exa{path}": n for path, n in exa.calls.items()},
+                                   **{f"serper{path}": n for path, n in serper.calls.items()}},
+                    "agents": {role: {"llm_calls": ollama.agent_calls[role], "llm_time_s": round(t, 3)}
+                               for role, t in sorted(ollama.agent_time.items())},
+                })
+    finally:
+        for service in (exa, serper, ollama):
+            service.stop()
+    return results
+
+
+def print_summary(results):
+    print(f"\n{'crew':<10} {'run':>3} {'wall s':>8} {'RSS MB':>8} {'LLM':>5} {'tools':>6}  status")
+    for r in results:
+        print(f"{r['crew']:<10} {r['run']:>3} {r['wall_time_s']:>8.2f} {r['peak_rss_mb']:>8.2f} "
+              f"{r['llm_calls']:>5} {sum(r['tool_calls'].values()):>6}  {r['status']}")
+    for r in results:
+        print(f"\n{r['crew']} run {r['run']} per agent (LLM busy time):")
+        for role, stats in r["agents"].items():
+            print(f"  {role:<55} {stats['llm_time_s']:>8.2f}s  {stats['llm_calls']:>3} calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark of the OSINT crews against local fake Exa, Serper and Ollama servers")
+    parser.add_argument("--crew", choices=["terminal", "ui", "all"], default="all")
+    parser.add_argument("--company", default="Acme Corp")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--search-latency", type=float, default=0.2, help="Seconds per fake Exa/Serper response")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds before the fake Ollama starts streaming")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Seconds between streamed tokens")
+    parser.add_argument("--num-results", type=int, default=10, help="Results per fake search response")
+    parser.add_argument("--content-chars", type=int, default=5000, help="Characters of text per fake Exa document")
+    parser.add_argument("--answer-chars", type=int, default=1500, help="Characters in each agent's final answer")
+    parser.add_argument("--tool-calls", type=int, default=2, help="Tool calls each fake agent makes before answering")
+    parser.add_argument("--warm-cache", action="store_true", help="Reuse the configured search/LLM caches instead of fresh ones")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    crews = ["terminal", "ui"] if args.crew == "all" else [args.crew]
+    results = run_benchmark(crews, args.company, args)
+    print_summary(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
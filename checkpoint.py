@@ -0,0 +1,90 @@
+import json
+import os
+import re
+import time
+import uuid
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "run"
+
+
+class Checkpoint:
+    """Run directory holding each task's output as soon as the task completes.
+
+    ``CHECKPOINT_DIR/<run-id>/`` contains ``meta.json`` (company, status) and one
+    JSON file per completed task. Re-opening the same run id skips what is already
+    saved; files are written atomically so a killed process never leaves a torn one.
+    """
+
+    def __init__(self, company=None, run_id=None, root=None):
+        self.root = root or os.getenv("CHECKPOINT_DIR", os.path.join(".osint_cache", "runs"))
+        self.run_id = run_id or f"{_slug(company or 'run')}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.path = os.path.join(self.root, self.run_id)
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        elif run_id and company is None:
+            raise ValueError(f"No checkpointed run {run_id!r} in {self.root}")
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            self.meta = {"run_id": self.run_id, "company": company, "status": "running", "created_at": time.time()}
+            self._write("meta.json", self.meta)
+
+    @property
+    def company(self):
+        return self.meta["company"]
+
+    @property
+    def finished(self):
+        return self.meta.get("status") == "done"
+
+    @classmethod
+    def latest(cls, company, root=None):
+        """The most recent unfinished run for ``company``, or ``None``."""
+        root = root or os.getenv("CHECKPOINT_DIR", os.path.join(".osint_cache", "runs"))
+        key = " ".join(company.lower().split())
+        runs = []
+        for name in os.listdir(root) if os.path.isdir(root) else []:
+            try:
+                with open(os.path.join(root, name, "meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if meta.get("status") != "done" and " ".join(str(meta.get("company", "")).lower().split()) == key:
+                runs.append((meta.get("created_at", 0), name))
+        return cls(run_id=max(runs)[1], root=root) if runs else None
+
+    def _write(self, name, data):
+        tmp = os.path.join(self.path, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, name))
+
+    def _file(self, task):
+        return _slug(task) + ".json"
+
+    def save(self, task, output):
+        self._write(self._file(task), {"task": task, "output": output, "completed_at": time.time()})
+
+    def load(self, task):
+        """Saved output of ``task``, or ``None`` if it hasn't completed in this run."""
+        try:
+            with open(os.path.join(self.path, self._file(task)), encoding="utf-8") as f:
+                return json.load(f)["output"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def callback(self, task, then=None):
+        """Task callback that saves the output under ``task`` before calling ``then``."""
+        def save(output):
+            self.save(task, output.raw_output)
+            if then is not None:
+                then(output)
+        return save
+
+    def finish(self, report):
+        self.save("report", str(report))
+        self.meta.update(status="done", finished_at=time.time())
+        self._write("meta.json", self.meta)
@@ -0,0 +1,423 @@
+import asyncio
+import ipaddress
+import os
+import random
+import re
+import ssl
+import struct
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+DNS_TYPES = {"A": 1, "NS": 2, "CNAME": 5, "MX": 15, "TXT": 16, "AAAA": 28}
+DNS_TYPE_NAMES = {code: name for name, code in DNS_TYPES.items()}
+
+# Response headers / cookies / markup that give away hosting and technology
+HEADER_FINGERPRINTS = {
+    "cf-ray": "Cloudflare",
+    "x-vercel-id": "Vercel",
+    "x-amz-cf-id": "Amazon CloudFront",
+    "x-served-by": "Fastly",
+    "x-github-request-id": "GitHub Pages",
+    "x-shopify-stage": "Shopify",
+    "x-wix-request-id": "Wix",
+    "x-drupal-cache": "Drupal",
+    "x-akamai-transformed": "Akamai",
+    "x-aspnet-version": "ASP.NET",
+}
+COOKIE_FINGERPRINTS = {
+    "PHPSESSID": "PHP",
+    "JSESSIONID": "Java",
+    "ASP.NET_SessionId": "ASP.NET",
+    "laravel_session": "Laravel",
+    "csrftoken": "Django",
+    "_shopify_y": "Shopify",
+    "wordpress_": "WordPress",
+}
+BODY_FINGERPRINTS = {
+    "wp-content/": "WordPress",
+    "__NEXT_DATA__": "Next.js",
+    "__NUXT__": "Nuxt.js",
+    "data-reactroot": "React",
+    "ng-version": "Angular",
+    "cdn.shopify.com": "Shopify",
+    "static.squarespace.com": "Squarespace",
+    "static.wixstatic.com": "Wix",
+    "googletagmanager.com": "Google Tag Manager",
+    "google-analytics.com": "Google Analytics",
+    "hubspot": "HubSpot",
+}
+SECURITY_HEADERS = ["strict-transport-security", "content-security-policy", "x-frame-options",
+                    "x-content-type-options", "referrer-policy", "permissions-policy"]
+WHOIS_FIELDS = {
+    "registrar": ["registrar"],
+    "created": ["creation date", "created", "registered on", "registration time"],
+    "expires": ["registry expiry date", "registrar registration expiration date", "expiry date", "expires", "paid-till"],
+    "updated": ["updated date", "last updated", "changed"],
+    "registrant": ["registrant organization", "registrant", "org"],
+    "name_servers": ["name server", "nserver"],
+}
+
+
+def domain_from(value):
+    """Host name from a URL, e-mail address or bare domain, without a leading ``www.``."""
+    value = str(value).strip().lower()
+    if "@" in value and "://" not in value:
+        value = value.rsplit("@", 1)[1]
+    host = urlsplit(value if "://" in value else "//" + value).hostname or value
+    return host[4:] if host.startswith("www.") else host
+
+
+def system_nameserver():
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return "1.1.1.1"
+
+
+# --- DNS -------------------------------------------------------------------------
+
+def _encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode("idna") for label in name.strip(".").split(".")) + b"\0"
+
+
+def _read_name(message, offset):
+    labels, jumped, end = [], False, offset
+    for _ in range(128):  # guards against compression loops
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if not jumped:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumped = True
+        elif length == 0:
+            return ".".join(labels), (end if jumped else offset + 1)
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+            offset += length + 1
+    raise ValueError("malformed DNS name")
+
+
+def build_query(name, rtype, query_id=None):
+    query_id = random.randint(0, 0xFFFF) if query_id is None else query_id
+    return struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + _encode_name(name) + struct.pack(">HH", DNS_TYPES[rtype], 1)
+
+
+def parse_response(message):
+    """Answers of a DNS response as ``[(type, value)]``; MX values are ``"priority host"``."""
+    _, flags, qdcount, ancount, _, _ = struct.unpack(">HHHHHH", message[:12])
+    if flags & 0x000F not in (0, 3):  # anything but NOERROR / NXDOMAIN
+        raise ValueError(f"DNS error rcode {flags & 0x000F}")
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(message, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        _, offset = _read_name(message, offset)
+        rtype, _, _, length = struct.unpack(">HHIH", message[offset:offset + 10])
+        offset += 10
+        rdata = message[offset:offset + length]
+        name = DNS_TYPE_NAMES.get(rtype)
+        if name == "A":
+            answers.append((name, str(ipaddress.IPv4Address(rdata))))
+        elif name == "AAAA":
+            answers.append((name, str(ipaddress.IPv6Address(rdata))))
+        elif name in ("NS", "CNAME"):
+            answers.append((name, _read_name(message, offset)[0]))
+        elif name == "MX":
+            answers.append((name, f"{struct.unpack('>H', rdata[:2])[0]} {_read_name(message, offset + 2)[0]}"))
+        elif name == "TXT":
+            parts, i = [], 0
+            while i < len(rdata):
+                parts.append(rdata[i + 1:i + 1 + rdata[i]].decode("utf-8", "replace"))
+                i += rdata[i] + 1
+            answers.append((name, "".join(parts)))
+        offset += length
+    return answers
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, query_id, future):
+        self.query_id = query_id
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 2 and struct.unpack(">H", data[:2])[0] == self.query_id and not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+async def _query_tcp(query, nameserver, port, timeout):
+    """Send ``query`` over TCP (each message prefixed with its 2-byte length) and return the response."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(nameserver, port), timeout)
+    try:
+        writer.write(struct.pack(">H", len(query)) + query)
+        await writer.drain()
+        length = struct.unpack(">H", await asyncio.wait_for(reader.readexactly(2), timeout))[0]
+        return await asyncio.wait_for(reader.readexactly(length), timeout)
+    finally:
+        writer.close()
+
+
+async def resolve(name, rtype, nameserver, port=53, timeout=3.0):
+    """Values of ``name``'s ``rtype`` records, asked over UDP and again over TCP when the answer was truncated."""
+    loop = asyncio.get_running_loop()
+    query_id = random.randint(0, 0xFFFF)
+    future = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _DNSProtocol(query_id, future), remote_addr=(nameserver, port))
+    query = build_query(name, rtype, query_id)
+    try:
+        transport.sendto(query)
+        message = await asyncio.wait_for(future, timeout)
+    finally:
+        transport.close()
+    if struct.unpack(">H", message[2:4])[0] & 0x0200:  # TC: the answer didn't fit in a datagram
+        message = await _query_tcp(query, nameserver, port, timeout)
+    return [value for kind, value in parse_response(message) if kind == rtype]
+
+
+# --- WHOIS -----------------------------------------------------------------------
+
+async def whois_query(server, query, port=43, timeout=5.0):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(server, port), timeout)
+    try:
+        writer.write(query.encode("utf-8") + b"\r\n")
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(-1), timeout)
+    finally:
+        writer.close()
+    return data.decode("utf-8", "replace")
+
+
+def parse_whois(text):
+    facts = {}
+    for line in text.splitlines():
+        key, sep, value = line.strip().partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or not value:
+            continue
+        for field, names in WHOIS_FIELDS.items():
+            if key in names:
+                if field == "name_servers":
+                    facts.setdefault(field, [])
+                    if value.lower() not in facts[field]:
+                        facts[field].append(value.lower())
+                else:
+                    facts.setdefault(field, value)
+    return facts
+
+
+# --- TLS / HTTP ------------------------------------------------------------------
+
+def _tls_context(verify, ca_file):
+    context = ssl.create_default_context(cafile=ca_file)
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _decode_cert(der):
+    """``getpeercert()``-style details of a DER certificate, or ``{}`` if it can't be decoded.
+
+    An unverified handshake only exposes the raw certificate; the ssl module can
+    decode it from a PEM file (there is no public API for bytes).
+    """
+    decode = getattr(ssl._ssl, "_test_decode_cert", None)
+    if not der or decode is None:
+        return {}
+    with tempfile.NamedTemporaryFile("w", suffix=".pem", delete=False) as f:
+        f.write(ssl.DER_cert_to_PEM_cert(der))
+    try:
+        return decode(f.name)
+    except (ssl.SSLError, ValueError):
+        return {}
+    finally:
+        os.unlink(f.name)
+
+
+async def tls_probe(host, port=443, timeout=5.0, ca_file=None, connect_host=None):
+    """TLS version, cipher and certificate details; falls back to an unverified handshake on verification errors."""
+    result = {}
+    for verify in (True, False):
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(
+                connect_host or host, port, ssl=_tls_context(verify, ca_file), server_hostname=host), timeout)
+        except ssl.SSLCertVerificationError as e:
+            result["verified"] = False
+            result["verify_error"] = e.verify_message or str(e)
+            continue
+        tls = writer.get_extra_info("ssl_object")
+        result.setdefault("verified", True)
+        result["handshake_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["version"] = tls.version()
+        result["cipher"] = tls.cipher()[0]
+        # Without verification getpeercert() is empty, so decode the raw certificate instead
+        cert = tls.getpeercert() or _decode_cert(tls.getpeercert(binary_form=True))
+        if not cert:
+            result["cert_unavailable"] = True
+        else:
+            result["subject"] = dict(x[0] for x in cert.get("subject", ()))
+            issuer = dict(x[0] for x in cert.get("issuer", ()))
+            result["issuer"] = issuer.get("organizationName") or issuer.get("commonName")
+            result["not_after"] = cert.get("notAfter")
+            result["days_left"] = int((ssl.cert_time_to_seconds(cert["notAfter"]) - time.time()) // 86400) if cert.get("notAfter") else None
+            result["san"] = [value for kind, value in cert.get("subjectAltName", ()) if kind == "DNS"][:20]
+        writer.close()
+        break
+    return result
+
+
+async def http_fingerprint(host, port=443, use_tls=True, timeout=5.0, ca_file=None, connect_host=None, max_body=65536):
+    """Status, notable headers and detected technologies from ``GET /``."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(
+        connect_host or host, port, ssl=_tls_context(False, ca_file) if use_tls else None,
+        server_hostname=host if use_tls else None), timeout)
+    try:
+        writer.write((f"GET / HTTP/1.1\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0 (osint-collector)\r\n"
+                      "Accept: text/html\r\nConnection: close\r\n\r\n").encode("ascii"))
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        body = b""
+        try:
+            while len(body) < max_body:
+                chunk = await asyncio.wait_for(reader.read(max_body - len(body)), timeout)
+                if not chunk:
+                    break
+                body += chunk
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        writer.close()
+
+    lines = head.decode("iso-8859-1").split("\r\n")
+    status = int(lines[0].split()[1]) if len(lines[0].split()) > 1 else None
+    headers, cookies = {}, []
+    for line in lines[1:]:
+        key, sep, value = line.partition(":")
+        if sep:
+            key = key.strip().lower()
+            if key == "set-cookie":
+                cookies.append(value.strip().split("=", 1)[0])
+            headers[key] = value.strip()
+    html = body.decode("utf-8", "replace")
+    tech = []
+    for header in ("server", "x-powered-by", "x-generator"):
+        if header in headers:
+            tech.append(headers[header])
+    tech += [name for header, name in HEADER_FINGERPRINTS.items() if header in headers]
+    tech += [name for cookie, name in COOKIE_FINGERPRINTS.items() if any(c.startswith(cookie) for c in cookies)]
+    tech += [name for marker, name in BODY_FINGERPRINTS.items() if marker in html]
+    generator = re.search(r'<meta[^>]+name=["\']generator["\'][^>]+content=["\']([^"\']+)', html, re.I)
+    if generator:
+        tech.append(generator.group(1))
+    title = re.search(r"<title[^>]*>(.*?)</title>", html, re.I | re.S)
+    return {
+        "status": status,
+        "redirect": headers.get("location"),
+        "title": " ".join(title.group(1).split())[:120] if title else None,
+        "technologies": list(dict.fromkeys(tech)),
+        "security_headers": {h: h in headers for h in SECURITY_HEADERS},
+    }
+
+
+# --- Collector -------------------------------------------------------------------
+
+class DomainCollector:
+    """Runs DNS, WHOIS, TLS and HTTP lookups for a domain concurrently with asyncio.
+
+    Every endpoint is configurable so the collector can be pointed at local
+    stand-ins: ``nameserver``/``dns_port``, ``whois_server``/``whois_port``,
+    ``https_port`` and ``connect_host`` (where TLS/HTTP connections go, while the
+    domain is still sent as SNI and Host). A failing probe only empties its own
+    part of the result.
+    """
+
+    def __init__(self, nameserver=None, dns_port=None, whois_server=None, whois_port=None,
+                 https_port=None, connect_host=None, ca_file=None, timeout=None):
+        self.nameserver = nameserver or os.getenv("COLLECTOR_NAMESERVER") or system_nameserver()
+        self.dns_port = int(dns_port or os.getenv("COLLECTOR_DNS_PORT", 53))
+        self.whois_server = whois_server or os.getenv("COLLECTOR_WHOIS_SERVER", "whois.iana.org")
+        self.whois_port = int(whois_port or os.getenv("COLLECTOR_WHOIS_PORT", 43))
+        self.https_port = int(https_port or os.getenv("COLLECTOR_HTTPS_PORT", 443))
+        self.connect_host = connect_host or os.getenv("COLLECTOR_CONNECT_HOST")
+        self.ca_file = ca_file or os.getenv("COLLECTOR_CA_FILE")
+        self.timeout = float(timeout or os.getenv("COLLECTOR_TIMEOUT", 5))
+
+    async def _dns(self, domain):
+        types = ["A", "AAAA", "MX", "NS", "TXT"]
+        answers = await asyncio.gather(
+            *(resolve(domain, t, self.nameserver, self.dns_port, self.timeout) for t in types),
+            return_exceptions=True)
+        return {t: (a if not isinstance(a, Exception) else {"error": str(a) or type(a).__name__})
+                for t, a in zip(types, answers)}
+
+    async def _whois(self, domain):
+        text = await whois_query(self.whois_server, domain, self.whois_port, self.timeout)
+        referral = re.search(r"^(?:refer|whois server|registrar whois server):\s*(\S+)", text, re.I | re.M)
+        if referral and referral.group(1).lower() != self.whois_server.lower():
+            text = await whois_query(referral.group(1), domain, self.whois_port, self.timeout)
+        return parse_whois(text)
+
+    async def collect_async(self, domain):
+        domain = domain_from(domain)
+        started = time.perf_counter()
+        names = ["dns", "whois", "tls", "http"]
+        results = await asyncio.gather(
+            self._dns(domain),
+            self._whois(domain),
+            tls_probe(domain, self.https_port, self.timeout, self.ca_file, self.connect_host),
+            http_fingerprint(domain, self.https_port, True, self.timeout, self.ca_file, self.connect_host),
+            return_exceptions=True)
+        facts = {"domain": domain}
+        for name, result in zip(names, results):
+            facts[name] = {"error": str(result) or type(result).__name__} if isinstance(result, Exception) else result
+        facts["elapsed_s"] = round(time.perf_counter() - started, 2)
+        return facts
+
+    def collect(self, domain):
+        return asyncio.run(self.collect_async(domain))
+
+
+def format_facts(facts):
+    """Compact plain-text rendering of collector results for an agent."""
+    lines = [f"Domain: {facts['domain']}"]
+    dns = facts.get("dns", {})
+    if "error" in dns:
+        lines.append(f"DNS: error {dns['error']}")
+    else:
+        for rtype, values in dns.items():
+            text = f"error {values['error']}" if isinstance(values, dict) else (", ".join(values) or "none")
+            lines.append(f"DNS {rtype}: {text}")
+    whois = facts.get("whois", {})
+    lines.append("WHOIS: " + ("; ".join(f"{k}: {', '.join(v) if isinstance(v, list) else v}" for k, v in whois.items()) or "no data"))
+    tls = facts.get("tls", {})
+    if "error" in tls:
+        lines.append(f"TLS: error {tls['error']}")
+    else:
+        lines.append(f"TLS: {tls.get('version')} {tls.get('cipher')}, verified={tls.get('verified')}"
+                     + (f" ({tls['verify_error']})" if tls.get("verify_error") else "")
+                     + (f", issuer {tls['issuer']}, expires {tls['not_after']} ({tls['days_left']} days)" if tls.get("not_after") else "")
+                     + (f", SAN {', '.join(tls['san'])}" if tls.get("san") else "")
+                     + (", certificate details unavailable" if tls.get("cert_unavailable") else ""))
+    http = facts.get("http", {})
+    if "error" in http:
+        lines.append(f"HTTP: error {http['error']}")
+    else:
+        missing = [h for h, present in http.get("security_headers", {}).items() if not present]
+        lines.append(f"HTTP: status {http.get('status')}" + (f", redirects to {http['redirect']}" if http.get("redirect") else "")
+                     + (f", title \"{http['title']}\"" if http.get("title") else ""))
+        lines.append("Technologies: " + (", ".join(http.get("technologies", [])) or "none detected"))
+        lines.append("Missing security headers: " + (", ".join(missing) or "none"))
+    return "\n".join(lines)
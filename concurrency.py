@@ -0,0 +1,29 @@
+import threading
+from contextlib import contextmanager
+
+# Named semaphores bounding how many LLM generations / search API calls run at once.
+# Unconfigured names are unbounded.
+_limits = {}
+
+
+def configure(name, max_concurrent):
+    """Bound ``name`` to ``max_concurrent`` simultaneous holders (``None`` or 0 removes the bound)."""
+    if max_concurrent:
+        _limits[name] = threading.BoundedSemaphore(int(max_concurrent))
+    else:
+        _limits.pop(name, None)
+
+
+def install(semaphores):
+    """Install pre-built semaphores, e.g. multiprocessing ones shared with worker processes."""
+    _limits.update(semaphores)
+
+
+@contextmanager
+def limit(name):
+    semaphore = _limits.get(name)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
@@ -0,0 +1,16 @@
+import importlib.util
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CREWS = {
+    "terminal": os.path.join(HERE, "terminal-agent.py"),
+    "ui": os.path.join(HERE, "ui-agent.py"),
+}
+
+
+def load_script(name, path):
+    """Import one of the hyphen-named entry-point scripts as a module (its __main__ block doesn't run)."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+
+import requests
+
+import concurrency
+from crews import CREWS, load_script
+
+DAEMON_SOCKET = os.getenv("DAEMON_SOCKET", os.path.join(".osint_cache", "osint.sock"))
+DAEMON_WORKERS = int(os.getenv("DAEMON_WORKERS", 2))
+# How long Ollama keeps the models loaded after each warm-up ping, and how often to ping
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+WARM_INTERVAL = float(os.getenv("DAEMON_WARM_INTERVAL", 600))
+
+
+def send(wfile, message):
+    wfile.write((json.dumps(message) + "\n").encode())
+    wfile.flush()
+
+
+class OsintDaemon:
+    """Keeps the terminal crew resident and runs analyses for clients on a Unix socket.
+
+    The crew script is imported once (crewai, langchain and exa_py included), the
+    agent roster is built once at start-up to pay its construction cost, and every
+    model the agents are routed to is kept loaded in Ollama with periodic keep-alive
+    pings. Requests are one JSON line; replies are JSON lines ending with a ``done``
+    or ``error`` event.
+    """
+
+    def __init__(self, socket_path=DAEMON_SOCKET, workers=DAEMON_WORKERS, keep_alive=OLLAMA_KEEP_ALIVE,
+                 warm_interval=WARM_INTERVAL):
+        self.socket_path = socket_path
+        self.keep_alive = keep_alive
+        self.warm_interval = warm_interval
+        self.started = time.time()
+        self.crew = load_script("terminal_agent", CREWS["terminal"])
+        self.crew.OsintAgents().section_agent(self.crew.SECTIONS.get("Company Information"))
+        self.slots = threading.BoundedSemaphore(workers)
+        self.active = {}
+        self.completed = 0
+        self._lock = threading.Lock()
+        self.server = None
+
+    def _models(self):
+        """(base url, model) pairs the agents can be routed to."""
+        llm = self.crew.ollama_llm
+        if llm.pool is None:
+            return {(llm.base_url, llm.model)}
+        models = {llm.model, *llm.pool.models.values()}
+        return {(b.url, m) for b in llm.pool.backends for m in models if b.serves(m)}
+
+    def warm(self):
+        """Load every model into Ollama (an empty prompt only loads it) and keep it there."""
+        for url, model in sorted(self._models()):
+            started = time.time()
+            try:
+                requests.post(url.rstrip("/") + "/api/generate",
+                              json={"model": model, "prompt": "", "keep_alive": self.keep_alive, "stream": False},
+                              timeout=600).raise_for_status()
+                print(f"Warmed {model} on {url} in {time.time() - started:.1f}s")
+            except requests.RequestException as e:
+                print(f"Could not warm {model} on {url}: {e}")
+
+    def _keep_warm(self):
+        while True:
+            time.sleep(self.warm_interval)
+            self.warm()
+
+    def analyze(self, request, wfile):
+        company, run_id = request.get("company"), request.get("resume")
+        if not company and not run_id:
+            raise ValueError("'company' or 'resume' is required")
+        # Unknown profiles, sections or run ids are rejected before the request is queued
+        self.crew.SECTIONS.select(request.get("profile"), request.get("sections"))
+        if run_id:
+            self.crew.Checkpoint(run_id=run_id)
+        send(wfile, {"event": "queued"})
+        with self.slots:
+            with self._lock:
+                self.active[threading.get_ident()] = company or run_id
+            send(wfile, {"event": "started", "company": company, "resume": run_id})
+            try:
+                report = self.crew.run_analysis(
+                    company, run_id=run_id, resume=request.get("resume_latest", False),
+                    report_format=request.get("format"), summarize=request.get("summary") or self.crew.REPORT_SUMMARY,
+                    profile=request.get("profile"), sections=request.get("sections"))
+            finally:
+                with self._lock:
+                    self.active.pop(threading.get_ident(), None)
+                    self.completed += 1
+        send(wfile, {"event": "done", "report": str(report)})
+
+    def status(self):
+        crew = self.crew
+        with self._lock:
+            active = sorted(self.active.values())
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "active": active,
+            "completed": self.completed,
+            "search_cache": crew.search_cache.stats(),
+            "llm_cache": crew.ollama_llm.cache.stats() if crew.ollama_llm.cache else None,
+            "llm_backends": crew.ollama_llm.pool.stats() if crew.ollama_llm.pool else None,
+            "rate_limit": crew.rate_limit.stats(),
+            "recent_runs": [{"company": run.name, "run_id": run.attrs.get("run_id")} for run in crew.tracer.finished_runs()],
+        }
+
+    def trace(self, run_id=None):
+        """Timing table and tool-loop report of run ``run_id``, or of the latest finished run."""
+        runs = [run for run in self.crew.tracer.finished_runs() if run_id in (None, run.attrs.get("run_id"))]
+        if not runs:
+            raise ValueError(f"No trace held for run {run_id!r}" if run_id else "No run has finished yet")
+        trace_id = runs[-1].trace_id
+        return self.crew.tracer.summary(trace_id) + "\n\n" + self.crew.loop_controller.summary(trace_id)
+
+    def handle(self, request, wfile):
+        command = request.get("cmd")
+        if command == "analyze":
+            self.analyze(request, wfile)
+        elif command == "status":
+            send(wfile, {"event": "done", "status": self.status()})
+        elif command == "trace":
+            send(wfile, {"event": "done", "summary": self.trace(request.get("run_id"))})
+        elif command == "shutdown":
+            send(wfile, {"event": "done"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            raise ValueError(f"Unknown command {command!r}")
+
+    def serve(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    daemon.handle(json.loads(self.rfile.readline()), self.wfile)
+                except BrokenPipeError:
+                    pass
+                except Exception as e:
+                    traceback.print_exc()
+                    try:
+                        send(self.wfile, {"event": "error", "error": f"{type(e).__name__}: {e}"})
+                    except OSError:
+                        pass
+
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.warm()
+        threading.Thread(target=self._keep_warm, name="ollama-keep-alive", daemon=True).start()
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+        print(f"OSINT daemon ready on {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            os.unlink(self.socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the OSINT crew warm and serve analyses on a Unix socket")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix socket path")
+    parser.add_argument("--workers", type=int, default=DAEMON_WORKERS, help="Analyses run at the same time")
+    parser.add_argument("--llm-concurrency", type=int, help="Maximum simultaneous LLM generations")
+    parser.add_argument("--search-concurrency", type=int, help="Maximum simultaneous search API calls")
+    args = parser.parse_args()
+
+    daemon = OsintDaemon(args.socket, args.workers)
+    concurrency.configure("llm", args.llm_concurrency)
+    concurrency.configure("search", args.search_concurrency)
+    daemon.serve()
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from tracing import tracer
+
+# Click identifiers added by ad and mail platforms; they never change the page. Generic
+# names (ref, source, output, ...) are left alone since many sites serve different pages on them.
+TRACKING_PARAMS = {
+    "gclid", "gbraid", "wbraid", "dclid", "fbclid", "msclkid", "yclid", "twclid", "ttclid", "igshid",
+    "li_fat_id", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "oly_")
+
+# Maximum Hamming distance between 64-bit SimHashes for two texts to count as near-duplicates
+DEDUP_DISTANCE = int(os.getenv("DEDUP_DISTANCE", 3))
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def canonical_url(url):
+    """Canonical form of a URL: https, lower-case host without ``www.`` or default port,
+    no fragment, tracking parameters or AMP suffix, sorted query and no trailing slash.
+    """
+    url = str(url or "").strip()
+    if not url:
+        return url
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/+", "/", parts.path or "")
+    path = re.sub(r"/(?:index\.html?|amp/?)$", "", path).rstrip("/")
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES))
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def result_text(result):
+    """Title (without a trailing " - Site name") and snippet of a search result."""
+    title = re.sub(r"\s+[-|\u2013\u2014]\s+[^-|\u2013\u2014]{1,40}$", "", result.get("title") or "")
+    return f"{title} {result.get('snippet') or ''}"
+
+
+def simhash(text):
+    """64-bit SimHash of a text over word pairs (single words for very short texts)."""
+    words = _WORD.findall((text or "").lower())
+    features = [" ".join(pair) for pair in zip(words, words[1:])] or words
+    if not features:
+        return None
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SeenSet:
+    """URLs and SimHash fingerprints of the results already delivered in a run."""
+
+    def __init__(self, max_distance=DEDUP_DISTANCE):
+        self.max_distance = max_distance
+        self.urls = {}  # canonical url -> agents it was delivered to
+        self.fingerprints = []  # (simhash, canonical url)
+        self.lock = threading.Lock()
+
+    def near(self, fingerprint):
+        """Canonical URL of an earlier result within ``max_distance`` of ``fingerprint``."""
+        if fingerprint is None:
+            return None
+        for seen, url in self.fingerprints:
+            if distance(seen, fingerprint) <= self.max_distance:
+                return url
+        return None
+
+
+class Deduplicator:
+    """Collapses duplicate search results and page contents before they reach an agent.
+
+    A result is a duplicate when its canonical URL or the SimHash of its text
+    (title and snippet, or page content) matches one seen earlier. Within a tool
+    response duplicates are always collapsed. Across the run, a run-wide seen-set
+    drops what the calling agent was already given; other agents still get it.
+    Seen-sets are kept for the ``max_runs`` most recent runs.
+    """
+
+    def __init__(self, max_distance=DEDUP_DISTANCE, max_runs=64, enabled=None):
+        self.max_distance = max_distance
+        self.max_runs = max_runs
+        if enabled is None:
+            enabled = os.getenv("DEDUP_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _seen(self, kind):
+        key = (tracer.current_trace, kind)
+        with self._lock:
+            seen = self._runs.get(key)
+            if seen is None:
+                seen = self._runs[key] = SeenSet(self.max_distance)
+                while len({run for run, _ in self._runs}) > self.max_runs:
+                    self._runs.popitem(last=False)
+            self._runs.move_to_end(key)
+            return seen
+
+    def filter(self, results, text=result_text, min_words=4, kind="results"):
+        """Unique ``results`` (dicts with ``url``), in their original order.
+
+        ``text(result)`` is fingerprinted for near-duplicate detection when it has at
+        least ``min_words`` words; shorter texts only dedupe on their URL. Each
+        ``kind`` (search results, page contents) has its own seen-set, so reading a
+        page that was returned as a search result is not a duplicate.
+        """
+        if not self.enabled:
+            return list(results)
+        seen, agent = self._seen(kind), tracer.current_agent
+        unique = []
+        with seen.lock:
+            batch_urls, batch_prints = set(), []
+            for result in results:
+                try:
+                    url = canonical_url(result.get("url"))
+                except ValueError:  # unparseable (e.g. a bad port): dedupe on the URL as given
+                    url = str(result.get("url") or "").strip()
+                body = text(result)
+                fingerprint = simhash(body) if len(_WORD.findall((body or "").lower())) >= min_words else None
+                twin = url if url in seen.urls else seen.near(fingerprint)
+                duplicate = (url in batch_urls
+                             or (fingerprint is not None and any(distance(fingerprint, f) <= self.max_distance for f in batch_prints))
+                             or (twin is not None and agent in seen.urls.get(twin, ())))
+                if duplicate:
+                    with self._lock:
+                        self.dropped += 1
+                    continue
+                batch_urls.add(url)
+                if fingerprint is not None:
+                    batch_prints.append(fingerprint)
+                    if twin is None:
+                        seen.fingerprints.append((fingerprint, url))
+                seen.urls.setdefault(twin or url, set()).add(agent)
+                seen.urls.setdefault(url, set()).add(agent)
+                unique.append(result)
+        return unique
+
+    def stats(self):
+        with self._lock:
+            return {"dropped": self.dropped, "runs": len({run for run, _ in self._runs})}
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from passages import select_passages, tokenize
+
+
+# Seconds gathered documents are kept; older runs' documents are pruned (0 keeps them forever)
+DOC_STORE_TTL = float(os.getenv("DOC_STORE_TTL", 30 * 24 * 3600))
+PRUNE_INTERVAL = 3600
+
+
+class DocumentStore:
+    """SQLite index of every document and snippet gathered during a run.
+
+    Documents are keyed by company and run id, so later agents (notably the report
+    generator) can retrieve what earlier agents already fetched instead of searching
+    the web again. They live in a plain table indexed on (company, run_id, url); an
+    external-content FTS5 table over their title and content, kept in sync by
+    triggers, serves the full-text search. Documents older than ``ttl`` seconds are
+    pruned.
+    """
+
+    def __init__(self, path=None, ttl=DOC_STORE_TTL):
+        self.path = path or os.getenv("DOC_STORE_PATH", os.path.join(".osint_cache", "documents.sqlite"))
+        self.ttl = ttl
+        self._pruned_at = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            legacy = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'documents' AND sql LIKE 'CREATE VIRTUAL TABLE%'").fetchone()
+            if legacy:
+                conn.execute("ALTER TABLE documents RENAME TO documents_legacy")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    company TEXT NOT NULL,
+                    run_id TEXT,
+                    source TEXT,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    content TEXT,
+                    fetched_at REAL NOT NULL,
+                    UNIQUE (company, run_id, url)
+                );
+                CREATE INDEX IF NOT EXISTS documents_fetched_at ON documents (fetched_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, content, content='documents', content_rowid='id');
+                CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                    INSERT INTO documents_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                    INSERT INTO documents_fts (documents_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+                    INSERT INTO documents_fts (documents_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                    INSERT INTO documents_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+            """)
+            if legacy:
+                # Documents indexed before the metadata moved out of the FTS table
+                conn.execute("""INSERT OR IGNORE INTO documents (company, run_id, source, url, title, content, fetched_at)
+                                SELECT company, run_id, source, url, title, content, fetched_at FROM documents_legacy""")
+                conn.execute("DROP TABLE documents_legacy")
+        self.prune()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _company(company):
+        return " ".join(company.lower().split())
+
+    def add(self, company, run_id, source, documents):
+        """Index ``documents`` (dicts with ``url``, ``title`` and ``content``) for a run.
+
+        A URL already stored for the run is only replaced when the new content is longer,
+        so a full page fetched by ``get_contents`` supersedes its search-result title.
+        """
+        company = self._company(company)
+        with self._connect() as conn:
+            for doc in documents:
+                content = doc.get("content") or ""
+                conn.execute(
+                    """INSERT INTO documents (company, run_id, source, url, title, content, fetched_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (company, run_id, url) DO UPDATE SET
+                           source = excluded.source, title = excluded.title,
+                           content = excluded.content, fetched_at = excluded.fetched_at
+                       WHERE length(excluded.content) > length(documents.content)""",
+                    (company, run_id, source, doc["url"], doc.get("title") or "", content, time.time()))
+        if time.time() - self._pruned_at > PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self):
+        """Delete documents fetched more than ``ttl`` seconds ago; returns how many."""
+        self._pruned_at = time.time()
+        if not self.ttl:
+            return 0
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM documents WHERE fetched_at < ?", (time.time() - self.ttl,)).rowcount
+
+    def search(self, company, query, run_id=None, limit=5):
+        """Full-text search of a company's documents, best BM25 matches first.
+
+        Documents from ``run_id`` are preferred; earlier runs are only searched when
+        the current one has no match.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+        company = self._company(company)
+        with self._connect() as conn:
+            for scope, args in ((" AND d.run_id = ?", (run_id,)), ("", ())):
+                if scope and run_id is None:
+                    continue
+                rows = conn.execute(
+                    "SELECT d.title, d.url, d.content, d.source, d.run_id FROM documents_fts"
+                    " JOIN documents d ON d.id = documents_fts.rowid"
+                    f" WHERE documents_fts MATCH ? AND d.company = ?{scope}"
+                    " ORDER BY bm25(documents_fts) LIMIT ?",
+                    (match, company, *args, limit)).fetchall()
+                if rows:
+                    return [dict(zip(("title", "url", "text", "source", "run_id"), row)) for row in rows]
+        return []
+
+    def documents(self, company, run_id):
+        """URL, title, source and fetch time of every document gathered in a run."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, title, source, fetched_at FROM documents WHERE company = ? AND run_id = ? ORDER BY fetched_at",
+                (self._company(company), run_id)).fetchall()
+        return [dict(zip(("url", "title", "source", "fetched_at"), row)) for row in rows]
+
+    def retrieve(self, company, query, run_id=None, limit=5):
+        """Text for an agent: the most relevant passages of the best matching documents."""
+        documents = self.search(company, query, run_id, limit)
+        contents = []
+        for doc in select_passages(documents, query):
+            contents.append(f"Title: {doc['title']}\nURL: {doc['url']}\nContent: " + "\n[...]\n".join(doc["passages"]))
+        return "\n\n".join(contents)
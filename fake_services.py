@@ -0,0 +1,350 @@
+"""Local stand-ins for the services the tools talk to, used by the benchmark and tests.
+
+The Exa, Serper and Ollama fakes are small threaded HTTP servers with configurable
+latency and payload size; point the tools at them with ``EXA_BASE_URL``,
+``SERPER_URL`` and ``OLLAMA_BASE_URL``. ``FakeDNS``, ``FakeWhois`` and ``FakeSite``
+stand in for the DNS, WHOIS and HTTPS endpoints the domain collector probes; point
+a ``DomainCollector`` at them with its ``nameserver``/``dns_port``,
+``whois_server``/``whois_port``, ``https_port``, ``connect_host`` and ``ca_file``.
+"""
+import ipaddress
+import json
+import os
+import re
+import socketserver
+import ssl
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from collectors import DNS_TYPE_NAMES, DNS_TYPES, _encode_name, _read_name
+
+LOREM = ("Acme builds industrial tooling and publishes regular press releases about its products, "
+         "partners, leadership team, offices, patents and hiring plans. ")
+
+
+class FakeService:
+    """Base class: runs a ThreadingHTTPServer on a free local port and counts requests per path."""
+
+    def __init__(self, latency=0.0, ssl_context=None):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+                payload = json.loads(body or b"{}")
+                with service._lock:
+                    service.calls[self.path] += 1
+                service.handle(self, self.path, payload)
+
+            def do_GET(self):
+                with service._lock:
+                    service.calls[self.path] += 1
+                service.handle(self, self.path, {})
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        if ssl_context is not None:
+            self.server.socket = ssl_context.wrap_socket(self.server.socket, server_side=True)
+        self.port = self.server.server_address[1]
+        self.url = f"{'https' if ssl_context else 'http'}://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, request, path, payload):
+        raise NotImplementedError
+
+    @staticmethod
+    def send_json(request, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeExa(FakeService):
+    """Answers ``/search``, ``/findSimilar`` and ``/contents`` like the Exa API."""
+
+    def __init__(self, latency=0.2, num_results=10, content_chars=5000):
+        self.num_results = num_results
+        self.content_chars = content_chars
+        super().__init__(latency)
+
+    def _result(self, seed, i):
+        digest = zlib.crc32(seed.encode("utf-8")) % 10000
+        return {
+            "id": f"doc-{digest}-{i}",
+            "url": f"https://example.com/{digest}/{i}",
+            "title": f"Result {i} for {seed}",
+            "score": 1.0 - i / 100,
+            "publishedDate": "2024-01-01",
+            "author": "Fake Exa",
+        }
+
+    def handle(self, request, path, payload):
+        time.sleep(self.latency)
+        if path in ("/search", "/findSimilar"):
+            seed = payload.get("query") or payload.get("url", "")
+            count = min(payload.get("numResults", self.num_results), self.num_results)
+            self.send_json(request, {"results": [self._result(seed, i) for i in range(count)]})
+        elif path == "/contents":
+            text = (LOREM * (self.content_chars // len(LOREM) + 1))[:self.content_chars]
+            results = [dict(self._result(doc_id, 0), id=doc_id, text=text) for doc_id in payload.get("ids", [])]
+            self.send_json(request, {"results": results})
+        else:
+            self.send_json(request, {"error": f"unknown endpoint {path}"}, status=404)
+
+
+class FakeSerper(FakeService):
+    """Answers ``/search`` like the Serper Google search API."""
+
+    def __init__(self, latency=0.2, num_results=10, snippet_chars=200):
+        self.num_results = num_results
+        self.snippet_chars = snippet_chars
+        super().__init__(latency)
+
+    def handle(self, request, path, payload):
+        time.sleep(self.latency)
+        query = payload.get("q", "")
+        snippet = (LOREM * (self.snippet_chars // len(LOREM) + 1))[:self.snippet_chars]
+        organic = [{"title": f"Result {i} for {query}", "link": f"https://example.com/{i}", "snippet": snippet}
+                   for i in range(self.num_results)]
+        self.send_json(request, {"organic": organic})
+
+
+class FakeOllama(FakeService):
+    """Streams scripted ReAct turns from ``/api/generate`` like a local Ollama server.
+
+    Each agent calls the ``search`` tool ``tool_calls_per_agent`` times, then gives a
+    final answer of roughly ``answer_chars`` characters. Tokens are streamed with
+    ``token_latency`` seconds between them after an initial ``latency`` (prompt
+    processing). Busy time is recorded per agent role, parsed from the prompt.
+    ``/api/tags`` lists ``models`` plus any model asked for so far, so the LLM pool's
+    health checks pass.
+    """
+
+    def __init__(self, latency=0.5, token_latency=0.005, answer_chars=1500, tool_calls_per_agent=2,
+                 models=("llama3.1:latest",)):
+        self.models = list(models)
+        self.token_latency = token_latency
+        self.answer_chars = answer_chars
+        self.tool_calls_per_agent = tool_calls_per_agent
+        self.agent_time = defaultdict(float)
+        self.agent_calls = Counter()
+        super().__init__(latency)
+
+    def _reply(self, prompt):
+        company = re.search(r"Company Name\s*:\s*(.+)", prompt)
+        company = company.group(1).strip() if company else "the company"
+        observations = prompt.count("Observation:") - prompt.count("Observation: the result of the action")
+        if observations < self.tool_calls_per_agent:
+            query = f"{company} {['official website', 'news', 'overview', 'leadership'][observations % 4]}"
+            return ("Thought: Do I need to use a tool? Yes\n"
+                    "Action: search\n"
+                    f"Action Input: {json.dumps({'query': query})}\n")
+        answer = (f"Findings about {company}. " + LOREM * (self.answer_chars // len(LOREM) + 1))[:self.answer_chars]
+        return f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+
+    def handle(self, request, path, payload):
+        if path == "/api/tags":
+            with self._lock:
+                models = list(self.models)
+            self.send_json(request, {"models": [{"name": m, "model": m, "size": 0} for m in models]})
+            return
+        if path != "/api/generate":
+            self.send_json(request, {"error": f"unknown endpoint {path}"}, status=404)
+            return
+        model = payload.get("model")
+        with self._lock:
+            if model and model not in self.models and model + ":latest" not in self.models:
+                self.models.append(model)
+        started = time.perf_counter()
+        prompt = payload.get("prompt", "")
+        role = re.search(r"You are (.+?)\.", prompt)
+        role = role.group(1) if role else "unknown"
+        time.sleep(self.latency)
+        request.send_response(200)
+        request.send_header("Content-Type", "application/x-ndjson")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+
+        def chunk(data):
+            line = (json.dumps(data) + "\n").encode("utf-8")
+            request.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+
+        tokens = re.findall(r"\S+\s*|\s+", self._reply(prompt))
+        for token in tokens:
+            time.sleep(self.token_latency)
+            chunk({"model": payload.get("model"), "response": token, "done": False})
+        chunk({"model": payload.get("model"), "response": "", "done": True,
+               "prompt_eval_count": len(prompt) // 4, "eval_count": len(tokens)})
+        request.wfile.write(b"0\r\n\r\n")
+        with self._lock:
+            self.agent_calls[role] += 1
+            self.agent_time[role] += time.perf_counter() - started
+
+
+class FakeDNS:
+    """Answers A, AAAA, MX, NS and TXT queries over UDP and TCP on one local port.
+
+    ``records`` maps a name to ``{type: [values]}``, e.g. ``{"acme.test": {"MX":
+    ["10 mail.acme.test"]}}``. A response longer than ``udp_limit`` bytes goes out
+    over UDP truncated (TC bit set, no answers), as a real server does, so clients
+    have to ask again over TCP. Queries are counted per transport in ``calls``.
+    """
+
+    def __init__(self, records, udp_limit=512):
+        self.records = {name.lower(): rrsets for name, rrsets in records.items()}
+        self.udp_limit = udp_limit
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        service = self
+
+        class UDPHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                data, sock = self.request
+                sock.sendto(service.answer(data, "udp"), self.client_address)
+
+        class TCPHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                length = struct.unpack(">H", self.rfile.read(2))[0]
+                response = service.answer(self.rfile.read(length), "tcp")
+                self.wfile.write(struct.pack(">H", len(response)) + response)
+
+        # Both transports must share the port, like a real name server
+        for _ in range(20):
+            self.udp = socketserver.ThreadingUDPServer(("127.0.0.1", 0), UDPHandler)
+            self.port = self.udp.server_address[1]
+            try:
+                self.tcp = socketserver.ThreadingTCPServer(("127.0.0.1", self.port), TCPHandler)
+                break
+            except OSError:
+                self.udp.server_close()
+        else:
+            raise OSError("no local port free for both UDP and TCP")
+        for server in (self.udp, self.tcp):
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def _rdata(rtype, value):
+        if rtype == "A":
+            return ipaddress.IPv4Address(value).packed
+        if rtype == "AAAA":
+            return ipaddress.IPv6Address(value).packed
+        if rtype == "MX":
+            priority, host = value.split(None, 1)
+            return struct.pack(">H", int(priority)) + _encode_name(host)
+        if rtype == "TXT":
+            data = value.encode("utf-8")
+            return b"".join(bytes([len(data[i:i + 255])]) + data[i:i + 255] for i in range(0, len(data) or 1, 255))
+        return _encode_name(value)
+
+    def answer(self, query, transport):
+        with self._lock:
+            self.calls[transport] += 1
+        query_id = struct.unpack(">H", query[:2])[0]
+        name, offset = _read_name(query, 12)
+        rtype = DNS_TYPE_NAMES.get(struct.unpack(">H", query[offset:offset + 2])[0])
+        question = query[12:offset + 4]
+        rrsets = self.records.get(name.lower())
+        values = (rrsets or {}).get(rtype, [])
+        answers = b"".join(
+            _encode_name(name) + struct.pack(">HHIH", DNS_TYPES[rtype], 1, 300, len(rdata)) + rdata
+            for rdata in (self._rdata(rtype, v) for v in values))
+        flags = 0x8180 | (0 if rrsets is not None else 3)  # response, RD, RA; NXDOMAIN for unknown names
+        response = struct.pack(">HHHHHH", query_id, flags, 1, len(values), 0, 0) + question + answers
+        if transport == "udp" and len(response) > self.udp_limit:
+            return struct.pack(">HHHHHH", query_id, flags | 0x0200, 1, 0, 0, 0) + question
+        return response
+
+    def stop(self):
+        for server in (self.udp, self.tcp):
+            server.shutdown()
+            server.server_close()
+
+
+class FakeWhois:
+    """Answers WHOIS queries (one line in, the record out, then close) from ``records``.
+
+    ``records`` maps a domain to its WHOIS text; other queries get "No match".
+    """
+
+    def __init__(self, records):
+        self.records = {domain.lower(): text for domain, text in records.items()}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                query = self.rfile.readline().decode("utf-8").strip().lower()
+                with service._lock:
+                    service.calls[query] += 1
+                self.wfile.write(service.records.get(query, f'No match for "{query}".\r\n').encode("utf-8"))
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def self_signed_cert(host, directory=None, days=30):
+    """Create a self-signed certificate for ``host`` with the ``openssl`` CLI; returns ``(cert, key)`` paths."""
+    directory = directory or tempfile.mkdtemp(prefix="osint-fake-tls-")
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+                    "-days", str(days), "-subj", f"/CN={host}/O=Fake Site CA", "-addext", f"subjectAltName=DNS:{host}"],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+class FakeSite(FakeService):
+    """Serves ``GET /`` over TLS for ``host`` like a company website.
+
+    The certificate is self-signed (``cert_file`` is also its CA file). ``headers``
+    and ``body`` are what the HTTP fingerprint should pick up.
+    """
+
+    def __init__(self, host, headers=None, body="<html><head><title>Fake Site</title></head><body></body></html>",
+                 cert_file=None, key_file=None):
+        if cert_file is None:
+            cert_file, key_file = self_signed_cert(host)
+        self.cert_file = cert_file
+        self.headers = dict(headers or {"Server": "nginx"})
+        self.body = body
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        super().__init__(ssl_context=context)
+
+    def handle(self, request, path, payload):
+        body = self.body.encode("utf-8")
+        request.send_response(200)
+        for name, value in self.headers.items():
+            request.send_header(name, value)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
@@ -0,0 +1,99 @@
+import os
+import threading
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import concurrency
+import rate_limit
+
+# Settings are read at import time, so make sure .env has been loaded first
+load_dotenv()
+
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+
+_lock = threading.Lock()
+_session = None
+_exa = None
+
+
+def _provider_for(url):
+    if url.startswith(EXA_BASE_URL):
+        return "exa"
+    if url.startswith(SERPER_URL):
+        return "serper"
+    return None
+
+
+class TimeoutSession(requests.Session):
+    """Session that applies the configured timeouts, concurrency limit and provider rate limits."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+        provider = _provider_for(url)
+        with concurrency.limit("search"):
+            if provider is None:
+                return super().request(method, url, **kwargs)
+            with rate_limit.limiter(provider).acquire():
+                return super().request(method, url, **kwargs)
+
+
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,  # search APIs are POST-only but idempotent
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = TimeoutSession()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Process-wide keep-alive session shared by every search tool call."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def raise_for_outage(response):
+    """Raise ``requests.HTTPError`` for a 429 or 5xx response, whose body is not the API's answer."""
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+
+
+def get_exa():
+    """Process-wide Exa client whose requests go through the pooled session."""
+    global _exa
+    if _exa is None:
+        from exa_py import Exa
+
+        class PooledExa(Exa):
+            def request(self, endpoint, data):
+                res = get_session().post(self.base_url + endpoint, json=data, headers=self.headers)
+                if res.status_code != 200:
+                    # The response goes along so resilience can tell an outage from a bad request
+                    raise requests.HTTPError(f"Request failed with status code {res.status_code}: {res.text}", response=res)
+                return res.json()
+
+        with _lock:
+            if _exa is None:
+                _exa = PooledExa(api_key=os.environ["EXA_API_KEY"], base_url=EXA_BASE_URL)
+    return _exa
@@ -0,0 +1,138 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class Job:
+    """One analysis run. Progress events are kept so any number of viewers can replay them.
+
+    ``put`` has the same signature as ``queue.Queue.put``, so a job can be handed to
+    ``run_analysis`` as its event sink.
+    """
+
+    def __init__(self, job_id, company, key, user):
+        self.id = job_id
+        self.company = company
+        self.key = key
+        self.user = user
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = []
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def _finish(self, status, result=None, error=None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+    def wait_events(self, since, timeout=None):
+        """Return the events after index ``since``, waiting up to ``timeout`` for new ones."""
+        with self._cond:
+            if len(self.events) <= since and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[since:]
+
+
+class JobQueue:
+    """Server-side queue running analyses on a fixed number of worker threads.
+
+    Jobs are keyed by normalized company name: submitting a company that is queued,
+    running, or finished within ``result_ttl`` seconds returns the existing job
+    instead of starting a new run. A finished job (and its events) is forgotten
+    ``result_ttl`` seconds after it finished. Pending jobs are scheduled round-robin across users so one user queueing
+    many companies can't starve the others.
+    """
+
+    def __init__(self, run, workers=1, result_ttl=3600):
+        self.run = run
+        self.result_ttl = result_ttl
+        self._lock = threading.Condition()
+        self._jobs = {}
+        self._pending = OrderedDict()  # user -> deque of queued jobs
+        self._ids = itertools.count(1)
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"osint-worker-{i}", daemon=True).start()
+
+    @staticmethod
+    def _key(company):
+        return " ".join(company.lower().split())
+
+    def _evict_expired(self):
+        now = time.time()
+        for key, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at >= self.result_ttl:
+                del self._jobs[key]
+
+    def submit(self, company, user="anonymous"):
+        key = self._key(company)
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(key)
+            if job and (not job.finished or (job.status == "done" and time.time() - job.finished_at < self.result_ttl)):
+                return job
+            job = Job(next(self._ids), company, key, user)
+            self._jobs[key] = job
+            self._pending.setdefault(user, deque()).append(job)
+            self._lock.notify()
+            return job
+
+    def _next_job(self):
+        with self._lock:
+            while not self._pending:
+                self._lock.wait()
+            user, jobs = next(iter(self._pending.items()))
+            job = jobs.popleft()
+            # Move this user behind everyone else who is waiting
+            del self._pending[user]
+            if jobs:
+                self._pending[user] = jobs
+            job.status = "running"
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            try:
+                job._finish("done", result=self.run(job.company, job))
+            except Exception as e:
+                job._finish("error", error=e)
+
+    def position(self, job):
+        """Number of jobs that will start before ``job`` (0 once it is running)."""
+        with self._lock:
+            if job.status != "queued":
+                return 0
+            # Replay the round-robin order the workers will follow
+            pending = OrderedDict((user, deque(jobs)) for user, jobs in self._pending.items())
+            ahead = 0
+            while pending:
+                user, jobs = next(iter(pending.items()))
+                if jobs.popleft() is job:
+                    return ahead
+                ahead += 1
+                del pending[user]
+                if jobs:
+                    pending[user] = jobs
+            return ahead
+
+    def stats(self):
+        with self._lock:
+            self._evict_expired()
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "error")}
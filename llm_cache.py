@@ -0,0 +1,107 @@
+import os
+from typing import Any, Optional
+
+import requests
+from langchain_community.llms import Ollama
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+
+import concurrency
+from llm_pool import NoBackendAvailable, load_pool
+from search_cache import SearchCache
+
+
+def _flag(name):
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+class PromptCache(BaseCache):
+    """Persistent LLM response cache keyed by model settings and the exact prompt.
+
+    LangChain passes the serialized model parameters (model name, temperature,
+    top_p, stop words, ...) as ``llm_string``, so a change to any of them misses.
+    Entries live in a size-capped SQLite file with least-recently-used eviction.
+    """
+
+    def __init__(self, path=None, max_entries=None, ttl=None):
+        self.store = SearchCache(
+            path=path or os.getenv("LLM_CACHE_PATH", os.path.join(".osint_cache", "llm.sqlite")),
+            max_entries=max_entries or os.getenv("LLM_CACHE_MAX_ENTRIES", 2000),
+            ttls={"llm": int(ttl or os.getenv("LLM_CACHE_TTL", 30 * 24 * 3600))},
+            enabled=True,
+        )
+
+    def lookup(self, prompt, llm_string):
+        found, value = self.store.get("llm", llm_string + "\n" + prompt)
+        if not found:
+            return None
+        return [Generation(text=g["text"], generation_info=g.get("generation_info")) for g in value]
+
+    def update(self, prompt, llm_string, return_val):
+        value = [{"text": g.text, "generation_info": g.generation_info} for g in return_val]
+        self.store.set("llm", llm_string + "\n" + prompt, value)
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+    def stats(self):
+        return self.store.stats()
+
+
+class BoundedOllama(Ollama):
+    """Ollama LLM whose generations respect the ``llm`` concurrency limit.
+
+    With a ``pool`` (see llm_pool.py) each generation goes to the least-loaded healthy
+    backend serving the model, moving on to the next one if a backend can't be reached.
+    Cache hits are answered before ``_generate`` is reached, so they never wait.
+    """
+
+    pool: Optional[Any] = None
+
+    def routed(self, agent):
+        """This LLM on the model the pool routes ``agent`` to."""
+        model = self.pool.model_for(agent, self.model) if self.pool else self.model
+        return self if model == self.model else self.copy(update={"model": model})
+
+    def _generate(self, *args, **kwargs):
+        with concurrency.limit("llm"):
+            if self.pool is None:
+                return super()._generate(*args, **kwargs)
+            tried = []
+            while True:
+                with self.pool.acquire(self.model, exclude=tried) as backend:
+                    if backend is None:
+                        raise NoBackendAvailable(f"No LLM backend could serve {self.model} (tried {len(tried)})")
+                    try:
+                        return super(BoundedOllama, self.copy(update={"base_url": backend.url}))._generate(*args, **kwargs)
+                    except requests.ConnectionError:
+                        self.pool.mark_down(backend)
+                        tried.append(backend)
+
+
+def cached_ollama(model="llama3.1", temperature=None, cache_sampled=None, pool=None, **kwargs):
+    """Build the shared Ollama LLM, attaching a ``PromptCache`` when it is safe to.
+
+    ``temperature`` defaults to ``OLLAMA_TEMPERATURE``, itself ``0`` so the crews'
+    generations are deterministic and cacheable; set it empty for the model default.
+    Sampled generations (temperature > 0, or the model default) are not
+    deterministic, so they are only cached when ``cache_sampled`` or the
+    ``LLM_CACHE_SAMPLED`` setting opts in. ``LLM_CACHE_DISABLED`` turns caching off.
+    Generations are spread over the backends of ``pool`` (by default the one in the
+    LLM pool config file, if there is one), whose ``default_model`` replaces ``model``.
+    """
+    setting = os.getenv("OLLAMA_TEMPERATURE", "0").strip()
+    if temperature is None and setting:
+        temperature = float(setting)
+    if cache_sampled is None:
+        cache_sampled = _flag("LLM_CACHE_SAMPLED")
+    deterministic = temperature is not None and temperature <= 0
+    cache = None
+    if not _flag("LLM_CACHE_DISABLED") and (deterministic or cache_sampled):
+        cache = PromptCache()
+    if os.getenv("OLLAMA_BASE_URL"):
+        kwargs.setdefault("base_url", os.getenv("OLLAMA_BASE_URL"))
+    pool = pool or load_pool()
+    if pool is not None and pool.default_model:
+        model = pool.default_model
+    return BoundedOllama(model=model, temperature=temperature, cache=cache, pool=pool, **kwargs)
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+
+import requests
+
+# Pool configuration, e.g. a copy of llm_pool.example.json; LLM_POOL_CONFIG points elsewhere
+DEFAULT_CONFIG_PATH = "llm_pool.json"
+
+
+class NoBackendAvailable(RuntimeError):
+    """Every backend in the pool failed for a generation."""
+
+
+class Backend:
+    def __init__(self, url, max_in_flight=None):
+        self.url = url.rstrip("/")
+        self.max_in_flight = int(max_in_flight) if max_in_flight else None
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.healthy = True
+        self.models = None  # names reported by /api/tags, None until the first health check
+        self.checked_at = 0.0
+
+    def serves(self, model):
+        if self.models is None:
+            return True
+        return model in self.models or (":" not in model and model + ":latest" in self.models)
+
+    @property
+    def full(self):
+        return self.max_in_flight is not None and self.outstanding >= self.max_in_flight
+
+
+class LLMPool:
+    """Spreads generations over several Ollama endpoints.
+
+    ``acquire(model)`` hands out the healthy backend serving ``model`` with the fewest
+    outstanding requests, waiting while every candidate is at its ``max_in_flight``.
+    Backends are health-checked every ``health_interval`` seconds through
+    ``/api/tags`` (which also lists their models) and taken out of rotation when a
+    check or a generation fails to connect. ``model_for(agent)`` routes agents to
+    models by exact name or glob pattern.
+    """
+
+    def __init__(self, backends, default_model=None, models=None, health_interval=30, health_timeout=2):
+        if not backends:
+            raise ValueError("An LLM pool needs at least one backend")
+        self.backends = [b if isinstance(b, Backend) else Backend(**b) if isinstance(b, dict) else Backend(b)
+                         for b in backends]
+        self.default_model = default_model
+        self.models = dict(models or {})
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._cond = threading.Condition()
+        self._checker = None
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config["backends"], config.get("default_model"), config.get("models"),
+                   config.get("health_interval", 30), config.get("health_timeout", 2))
+
+    def model_for(self, agent, default=None):
+        """Model for ``agent``: an exact entry in ``models``, else the first matching glob."""
+        if agent in self.models:
+            return self.models[agent]
+        for pattern, model in self.models.items():
+            if fnmatchcase(agent, pattern):
+                return model
+        return self.default_model or default
+
+    def check(self, backend):
+        try:
+            response = requests.get(backend.url + "/api/tags", timeout=self.health_timeout)
+            response.raise_for_status()
+            models = {m["name"] for m in response.json().get("models", [])}
+            healthy = True
+        except (requests.RequestException, ValueError):
+            models, healthy = backend.models, False
+        with self._cond:
+            backend.healthy = healthy
+            backend.models = models or None
+            backend.checked_at = time.time()
+            self._cond.notify_all()
+
+    def _check_loop(self):
+        while True:
+            for backend in self.backends:
+                self.check(backend)
+            time.sleep(self.health_interval)
+
+    def _start_checks(self):
+        with self._cond:
+            if self._checker is not None:
+                return
+            self._checker = threading.Thread(target=self._check_loop, name="llm-pool-health", daemon=True)
+            self._checker.start()
+
+    def _pick(self, model, exclude):
+        candidates = [b for b in self.backends if b not in exclude and b.serves(model)]
+        healthy = [b for b in candidates if b.healthy]
+        # With every backend marked down, keep trying them rather than failing outright
+        candidates = healthy or candidates
+        if not candidates:
+            return None, False
+        free = [b for b in candidates if not b.full]
+        if not free:
+            return None, True
+        return min(free, key=lambda b: (b.outstanding, b.requests)), True
+
+    @contextmanager
+    def acquire(self, model, exclude=()):
+        """Reserve the least-loaded backend for one generation; yields ``None`` if none is left."""
+        self._start_checks()
+        with self._cond:
+            while True:
+                backend, exists = self._pick(model, exclude)
+                if backend is not None or not exists:
+                    break
+                self._cond.wait()
+            if backend is not None:
+                backend.outstanding += 1
+                backend.requests += 1
+        try:
+            yield backend
+        finally:
+            if backend is not None:
+                with self._cond:
+                    backend.outstanding -= 1
+                    self._cond.notify_all()
+
+    def mark_down(self, backend):
+        with self._cond:
+            backend.healthy = False
+            backend.failures += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {b.url: {"healthy": b.healthy, "outstanding": b.outstanding,
+                            "requests": b.requests, "failures": b.failures}
+                    for b in self.backends}
+
+
+def load_pool(path=None):
+    """The pool described by ``LLM_POOL_CONFIG`` (default ``llm_pool.json``), or ``None`` without one."""
+    path = path or os.getenv("LLM_POOL_CONFIG")
+    if path is None:
+        if not os.path.exists(DEFAULT_CONFIG_PATH):
+            return None
+        path = DEFAULT_CONFIG_PATH
+    return LLMPool.from_file(path)
@@ -0,0 +1,148 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from dedup import canonical_url
+from tracing import tracer
+
+# Per-agent budgets; an agent's loop is also cut short once it stops finding anything new
+AGENT_TIME_BUDGET = float(os.getenv("AGENT_TIME_BUDGET", 600))
+AGENT_TOKEN_BUDGET = int(os.getenv("AGENT_TOKEN_BUDGET", 30000))
+LOOP_STALE_CALLS = int(os.getenv("LOOP_STALE_CALLS", 2))
+
+STOP_MESSAGE = ("Stop using tools ({reason}). You already have everything these tools will find. "
+                "Give your Final Answer now, based on the information gathered so far.")
+
+_URL = re.compile(r"https?://[^\s'\"<>),\]]+")
+
+
+def _call_key(name, args, kwargs):
+    values = [" ".join(str(v).lower().split()) for v in list(args) + [kwargs[k] for k in sorted(kwargs)]]
+    return name + "(" + ", ".join(values) + ")"
+
+
+class AgentLoop:
+    def __init__(self, started):
+        self.started = started
+        self.calls = []
+        self.urls = set()
+        self.digests = set()
+        self.stale = 0
+        self.stop_reason = None
+
+
+class IterationController:
+    """Watches each agent's tool calls and ends its loop once it stops paying off.
+
+    Wrap tool functions with ``guard``. An agent is stopped when it repeats a call
+    that returned (retrying one that raised is not a repeat), when ``stale_calls``
+    calls in a row brought no new canonical URL or content, or when it exceeds its
+    wall-clock or token budget (measured from its traced LLM spans). From then on
+    its tool calls return a message telling it to give its final answer instead of
+    running, and the reason is recorded as a ``control`` span. Calls made
+    outside an agent's LLM loop (e.g. the pre-fetch) are not watched.
+    """
+
+    def __init__(self, time_budget=AGENT_TIME_BUDGET, token_budget=AGENT_TOKEN_BUDGET,
+                 stale_calls=LOOP_STALE_CALLS, enabled=None):
+        self.time_budget = time_budget
+        self.token_budget = token_budget
+        self.stale_calls = stale_calls
+        if enabled is None:
+            enabled = os.getenv("LOOP_CONTROL_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self._loops = {}
+        self._lock = threading.Lock()
+
+    def _loop(self):
+        """State of the calling agent's loop, or ``None`` outside an agent's LLM loop."""
+        trace, agent = tracer.current_trace, tracer.current_agent
+        llm_spans = [s for s in tracer.agent_spans(trace, agent) if s.kind == "llm"] if agent else []
+        if not llm_spans:
+            return None, None
+        with self._lock:
+            loop = self._loops.setdefault((trace, agent), AgentLoop(min(s.start for s in llm_spans)))
+        tokens = sum(s.attrs.get("prompt_tokens", 0) + s.attrs.get("completion_tokens", 0) for s in llm_spans)
+        return loop, tokens
+
+    @staticmethod
+    def _record_stop(loop, reason):
+        loop.stop_reason = reason
+        with tracer.span("control", "stop", reason=reason, tool_calls=len(loop.calls)):
+            pass
+
+    def _stop(self, loop, reason):
+        if loop.stop_reason is None:
+            self._record_stop(loop, reason)
+        return STOP_MESSAGE.format(reason=loop.stop_reason)
+
+    @staticmethod
+    def _urls(text):
+        urls = set()
+        for url in _URL.findall(text):
+            try:
+                urls.add(canonical_url(url.rstrip(".")))
+            except ValueError:  # e.g. an invalid port or IPv6 host; the content digest still counts
+                continue
+        return urls
+
+    def _novel(self, loop, result):
+        """Whether ``result`` brought a URL or content (e.g. new page text for known URLs) not seen before."""
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        urls = self._urls(text)
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        new = bool(urls - loop.urls) or digest not in loop.digests
+        loop.urls |= urls
+        loop.digests.add(digest)
+        return new
+
+    def guard(self, fn):
+        """Decorator for a tool function (apply it under ``@tool``)."""
+        @functools.wraps(fn)
+        def guarded(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            loop, tokens = self._loop()
+            if loop is None:
+                return fn(*args, **kwargs)
+            key = _call_key(fn.__name__, args, kwargs)
+            if loop.stop_reason:
+                return self._stop(loop, loop.stop_reason)
+            if key in loop.calls:
+                return self._stop(loop, f"repeated call {key}")
+            if time.time() - loop.started > self.time_budget:
+                return self._stop(loop, f"time budget of {self.time_budget:.0f}s used")
+            if tokens > self.token_budget:
+                return self._stop(loop, f"token budget of {self.token_budget} used")
+            result = fn(*args, **kwargs)
+            # Only a call that returned counts; retrying one that raised is not a repeat
+            loop.calls.append(key)
+            loop.stale = 0 if self._novel(loop, result) else loop.stale + 1
+            if loop.stale >= self.stale_calls:
+                # This result still goes back; the agent is told to stop on its next call
+                self._record_stop(loop, f"last {loop.stale} calls found nothing new")
+            return result
+        return guarded
+
+    def prune(self):
+        """Forget the loops of runs the tracer no longer holds (see ``Tracer.prune``)."""
+        with self._lock:
+            self._loops = {key: loop for key, loop in self._loops.items() if tracer.run_span(key[0]) is not None}
+
+    def report(self, trace_id=None):
+        """Tool calls, URLs found and why each agent stopped, for one run (all when ``None``)."""
+        with self._lock:
+            loops = sorted(self._loops.items(), key=lambda item: item[1].started)
+        return [{"trace_id": trace, "run": getattr(tracer.run_span(trace), "name", None), "agent": agent, "tool_calls": len(loop.calls), "urls": len(loop.urls),
+                 "stop_reason": loop.stop_reason or "finished"}
+                for (trace, agent), loop in loops if trace_id is None or trace == trace_id]
+
+    def summary(self, trace_id=None):
+        lines = [f"{'run':<20} {'agent':<42} {'tool calls':>10} {'urls':>5}  stopped"]
+        for r in self.report(trace_id):
+            lines.append(f"{(r['run'] or '')[:20]:<20} {r['agent'][:42]:<42} {r['tool_calls']:>10} {r['urls']:>5}  {r['stop_reason']}")
+        return "\n".join(lines)
@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Thin client for daemon.py: it only imports the standard library, so it starts instantly
+DAEMON_SOCKET = os.getenv("DAEMON_SOCKET", os.path.join(".osint_cache", "osint.sock"))
+
+
+def request(message, socket_path=DAEMON_SOCKET, on_event=None):
+    """Send one request to the daemon and return its final ``done`` event."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(message) + "\n").encode())
+        with sock.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                event = json.loads(line)
+                if event["event"] == "error":
+                    raise RuntimeError(event["error"])
+                if event["event"] == "done":
+                    return event
+                if on_event is not None:
+                    on_event(event)
+    raise RuntimeError("The daemon closed the connection without a result")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run OSINT analyses on the warm daemon (start it with `python daemon.py`)")
+    parser.add_argument("company", nargs="?", help="Company to analyze (asked for when omitted)")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Daemon Unix socket path")
+    parser.add_argument("--format", choices=["markdown", "html", "json"], help="Report format")
+    parser.add_argument("--summary", action="store_true", help="Start the report with an LLM executive summary")
+    parser.add_argument("--profile", help="Sections to run: quick, network-only, full (default: the daemon's SECTION_PROFILE)")
+    parser.add_argument("--sections", nargs="+", metavar="SECTION", help="Run only these sections (titles or short names)")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run from its checkpoint")
+    parser.add_argument("--status", action="store_true", help="Show the daemon's status and exit")
+    parser.add_argument("--trace", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Show the timing table of a run (default: the latest finished one) and exit")
+    parser.add_argument("--shutdown", action="store_true", help="Stop the daemon")
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            print(json.dumps(request({"cmd": "status"}, args.socket)["status"], indent=2))
+        elif args.trace:
+            print(request({"cmd": "trace", "run_id": None if args.trace == "latest" else args.trace}, args.socket)["summary"])
+        elif args.shutdown:
+            request({"cmd": "shutdown"}, args.socket)
+        else:
+            company = args.company or (None if args.resume else input("Enter the name of the company: "))
+            progress = {"queued": "Waiting for a free worker...", "started": "Analyzing..."}
+            done = request(
+                {"cmd": "analyze", "company": company, "resume": args.resume, "format": args.format, "summary": args.summary,
+                 "profile": args.profile, "sections": args.sections},
+                args.socket, on_event=lambda e: print(progress.get(e["event"], e["event"]), file=sys.stderr))
+            print(done["report"])
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No daemon on {args.socket}; start one with `python daemon.py`")
+    except RuntimeError as e:
+        sys.exit(f"OSINT analysis failed: {e}")
@@ -0,0 +1,118 @@
+import ast
+import json
+import math
+import os
+import re
+from collections import Counter
+
+# Characters of page text handed back to the agent per get_contents call
+CONTENT_CHAR_BUDGET = int(os.getenv("CONTENT_CHAR_BUDGET", 3000))
+PASSAGE_CHARS = int(os.getenv("PASSAGE_CHARS", 500))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def parse_ids(ids):
+    """Parse the ids an agent passes to ``get_contents`` without evaluating code.
+
+    Accepts a list, a JSON or Python list literal, or a comma/whitespace separated string.
+    """
+    if isinstance(ids, (list, tuple)):
+        return [str(i).strip() for i in ids if str(i).strip()]
+    text = str(ids).strip()
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(text)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(value, (list, tuple)):
+            return [str(i).strip() for i in value if str(i).strip()]
+        if isinstance(value, str):
+            text = value
+            break
+    return [i.strip("'\"[] ") for i in re.split(r"[,\s]+", text) if i.strip("'\"[] ")]
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def split_passages(text, max_chars=PASSAGE_CHARS):
+    """Split a document into paragraph-aligned passages of at most ``max_chars``."""
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        while len(paragraph) > max_chars:
+            # Break long paragraphs at the last sentence end (or space) within the limit
+            window = paragraph[:max_chars]
+            cut = window.rfind(". ") + 1
+            if cut < max_chars // 2:
+                cut = window.rfind(" ")
+            if cut < max_chars // 2:
+                cut = max_chars
+            passages.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            passages.append(paragraph)
+    return passages
+
+
+class BM25:
+    """Okapi BM25 scoring over a small in-memory corpus of passages."""
+
+    def __init__(self, corpus, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = [Counter(tokenize(text)) for text in corpus]
+        self.lengths = [sum(d.values()) for d in self.docs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+        df = Counter(term for d in self.docs for term in d)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def score(self, query_terms, index):
+        doc, length = self.docs[index], self.lengths[index]
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term)
+            if tf:
+                norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return score
+
+
+def select_passages(documents, query, budget=CONTENT_CHAR_BUDGET):
+    """Pick the passages most relevant to ``query`` from fetched documents, within ``budget`` characters.
+
+    ``documents`` are dicts with ``title``, ``url`` and ``text``. Returns the documents
+    that contributed passages, each with a ``passages`` list in original order.
+    Without a query (or when nothing matches it), the opening passages of each
+    document are used in turn.
+    """
+    candidates = []  # (doc index, passage index, text)
+    for d, doc in enumerate(documents):
+        for p, passage in enumerate(split_passages(doc.get("text") or "")):
+            candidates.append((d, p, passage))
+    terms = tokenize(query or "")
+    ranked = []
+    if terms and candidates:
+        bm25 = BM25([c[2] for c in candidates])
+        scores = [bm25.score(terms, i) for i in range(len(candidates))]
+        # Passages sharing no term with the query are dropped rather than used as filler
+        ranked = sorted((i for i in range(len(candidates)) if scores[i] > 0), key=lambda i: (-scores[i], candidates[i][1]))
+    if not ranked:
+        ranked = sorted(range(len(candidates)), key=lambda i: (candidates[i][1], candidates[i][0]))
+
+    chosen, used = [], 0
+    for i in ranked:
+        length = len(candidates[i][2])
+        if used + length > budget:
+            continue
+        chosen.append(candidates[i])
+        used += length
+    selected = []
+    for d, doc in enumerate(documents):
+        passages = [text for cd, _, text in sorted(chosen) if cd == d]
+        if passages:
+            selected.append(dict(doc, passages=passages))
+    return selected
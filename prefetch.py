@@ -0,0 +1,120 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from collectors import domain_from
+from tracing import tracer
+
+# Canonical lookups every agent would otherwise repeat; override as JSON in
+# PREFETCH_QUERIES, e.g. {"Official website": "{company} official site"}.
+DEFAULT_QUERIES = {
+    "Official website": "{company} official website",
+    "LinkedIn": "{company} LinkedIn company page",
+    "Wikipedia": "{company} Wikipedia",
+    "Crunchbase": "{company} Crunchbase profile",
+    "Recent news": "{company} latest news",
+}
+PREFETCH_RESULTS = int(os.getenv("PREFETCH_RESULTS", 3))
+
+# Hosts that show up for "official website" queries but are never the company's own site
+THIRD_PARTY_DOMAINS = {
+    "linkedin.com", "wikipedia.org", "crunchbase.com", "bloomberg.com", "facebook.com", "twitter.com",
+    "x.com", "instagram.com", "youtube.com", "github.com", "glassdoor.com", "indeed.com", "reddit.com",
+    "trustpilot.com", "zoominfo.com", "dnb.com", "pitchbook.com", "owler.com", "reuters.com", "forbes.com",
+    "google.com", "apple.com", "medium.com", "yelp.com", "sec.gov",
+}
+
+
+# Second-level labels under a country code that are part of the suffix (bbc.co.uk, acme.com.au)
+SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "edu", "ac", "or", "ne", "go", "ltd", "plc"}
+# Words in company names that say nothing about the domain ("Acme Corporation" -> acme)
+GENERIC_NAME_WORDS = {
+    "the", "inc", "corp", "corporation", "company", "ltd", "limited", "llc", "plc", "gmbh", "group",
+    "holdings", "international", "technologies", "technology", "systems", "solutions", "services",
+}
+
+
+def _third_party(domain):
+    return any(domain == d or domain.endswith("." + d) for d in THIRD_PARTY_DOMAINS)
+
+
+def registrable_label(domain):
+    """The label a company registers: ``acme`` for www.acme.com, shop.acme.co.uk or acme.com.au."""
+    labels = domain.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return labels[-3]
+    return labels[-2] if len(labels) >= 2 else labels[0]
+
+
+def official_domain(company, results):
+    """Best guess at the company's own domain from search results (dicts with ``url``).
+
+    Third-party sites are skipped unless their name is the company's (Apple's own
+    site is apple.com). A domain named exactly after the company wins, then one
+    containing its name, then the first remaining result.
+    """
+    name = re.sub(r"[^a-z0-9]", "", company.lower())
+    words = [w for w in re.findall(r"[a-z0-9]+", company.lower()) if len(w) > 2 and w not in GENERIC_NAME_WORDS]
+    keys = {name, *words} - {""}
+    domains = [d for d in (domain_from(r.get("url", "")) for r in results) if d and "." in d]
+    labels = {d: re.sub(r"[^a-z0-9]", "", registrable_label(d)) for d in domains}
+    candidates = [d for d in domains if not _third_party(d) or labels[d] == name]
+    named = [d for d in candidates if len(labels[d]) > 2]
+    exact = [d for d in named if labels[d] in keys]
+    containing = [d for d in named if any(k in labels[d] for k in keys)]
+    return (exact or containing or candidates or [None])[0]
+
+
+class Prefetcher:
+    """Runs a fixed set of canonical searches for a company concurrently before the crew starts.
+
+    ``search(query)`` returns a list of dicts with ``title``, ``url`` and optionally
+    ``snippet``; it goes through the same cache and tracing as the agents' tools, so
+    an agent repeating one of these searches later gets it from the cache.
+    """
+
+    def __init__(self, search, queries=None, results_per_query=PREFETCH_RESULTS, max_workers=None):
+        self.search = search
+        self.queries = dict(queries or json.loads(os.getenv("PREFETCH_QUERIES", "null")) or DEFAULT_QUERIES)
+        self.results_per_query = results_per_query
+        self.max_workers = max_workers or len(self.queries) or 1
+        self.enabled = os.getenv("PREFETCH_DISABLED", "").lower() not in ("1", "true", "yes")
+
+    def _search(self, query):
+        try:
+            results = self.search(query)
+        except Exception:
+            return []
+        # Anything but a list of result dicts (e.g. a tool's error message) counts as no results
+        if not isinstance(results, list):
+            return []
+        return [r for r in results if isinstance(r, dict) and r.get("url")]
+
+    def run(self, company):
+        """Return ``{"domain": ..., "results": {label: [results]}}`` for ``company``."""
+        if not self.enabled or not self.queries:
+            return {"domain": None, "results": {}}
+        labels = list(self.queries)
+        search = tracer.bind(self._search, "Prefetch")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            found = list(pool.map(search, [self.queries[l].format(company=company) for l in labels]))
+        results = {label: hits[:self.results_per_query] for label, hits in zip(labels, found)}
+        ranked = found[labels.index("Official website")] if "Official website" in labels else []
+        domain = official_domain(company, ranked + [r for hits in found for r in hits])
+        return {"domain": domain, "results": results}
+
+    @staticmethod
+    def format(prefetched):
+        """Text block appended to every research task's description."""
+        if not prefetched["domain"] and not any(prefetched["results"].values()):
+            return ""
+        lines = ["Facts already looked up for you (start from these instead of searching for them again):"]
+        if prefetched["domain"]:
+            lines.append(f"Official domain: {prefetched['domain']}")
+        for label, hits in prefetched["results"].items():
+            if hits:
+                lines.append(f"{label}:")
+                lines.extend(f"- {h.get('title') or h['url']}: {h['url']}" + (f" ({h['snippet']})" if h.get("snippet") else "")
+                             for h in hits)
+        return "\n".join(lines)
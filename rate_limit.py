@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: limits are enforced per process only
+    fcntl = None
+
+# Provider defaults, overridable with <PROVIDER>_RATE_LIMIT (requests/second) and
+# <PROVIDER>_MAX_IN_FLIGHT in the environment.
+DEFAULT_LIMITS = {
+    "exa": {"rate": 5.0, "max_in_flight": 5},
+    "serper": {"rate": 5.0, "max_in_flight": 5},
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens/second up to ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token if one is available, otherwise return the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            delay = self._take()
+            if not delay:
+                return
+            time.sleep(delay)
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket whose state lives in a lock-protected file shared by all local processes."""
+
+    def __init__(self, path, rate, burst=None):
+        super().__init__(rate, burst)
+        self.path = path
+
+    def _take(self):
+        with self._lock, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = time.time()
+                tokens = min(self.burst, state.get("tokens", self.burst) + (now - state.get("updated", now)) * self.rate)
+                delay = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    delay = (1 - tokens) / self.rate
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "updated": now}))
+                f.flush()
+                return delay
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class FileSlots:
+    """Cross-process counting semaphore built from ``size`` lock files."""
+
+    def __init__(self, directory, name, size):
+        self.paths = [os.path.join(directory, f"{name}.slot{i}") for i in range(size)]
+        self._local = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def hold(self):
+        with self._local:
+            while True:
+                for path in self.paths:
+                    f = open(path, "a")
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        f.close()
+                        continue
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+                        f.close()
+                    return
+                time.sleep(0.05)
+
+
+class ProviderLimiter:
+    """Requests/second and max in-flight governor for one search provider.
+
+    With ``shared_dir`` set (and on platforms with ``fcntl``) the limits are shared
+    through lock files by every process on the machine, e.g. batch workers.
+    Time spent queueing is recorded so it shows up in the run metrics.
+    """
+
+    def __init__(self, name, rate, max_in_flight, shared_dir=None):
+        self.name = name
+        if shared_dir and fcntl is not None:
+            os.makedirs(shared_dir, exist_ok=True)
+            self.bucket = FileTokenBucket(os.path.join(shared_dir, f"{name}.bucket"), rate)
+            self.slots = FileSlots(shared_dir, name, max_in_flight)
+        else:
+            self.bucket = TokenBucket(rate)
+            self.slots = None
+            self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def _slot(self):
+        if self.slots:
+            with self.slots.hold():
+                yield
+        else:
+            with self._semaphore:
+                yield
+
+    @contextmanager
+    def acquire(self):
+        started = time.monotonic()
+        with self._slot():
+            self.bucket.acquire()
+            wait = time.monotonic() - started
+            with self._lock:
+                self.requests += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                if wait > 0.001:
+                    self.waited += 1
+            yield
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "queued": self.waited,
+                "total_wait_s": round(self.total_wait, 3),
+                "max_wait_s": round(self.max_wait, 3),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(provider):
+    """Process-wide limiter for ``provider``, configured from the environment on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            defaults = DEFAULT_LIMITS.get(provider, {"rate": 5.0, "max_in_flight": 5})
+            prefix = provider.upper()
+            shared = os.getenv("RATE_LIMIT_SHARED", "").lower() in ("1", "true", "yes")
+            _limiters[provider] = ProviderLimiter(
+                provider,
+                rate=float(os.getenv(f"{prefix}_RATE_LIMIT", defaults["rate"])),
+                max_in_flight=int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", defaults["max_in_flight"])),
+                shared_dir=os.getenv("RATE_LIMIT_DIR", os.path.join(".osint_cache", "ratelimit")) if shared else None,
+            )
+        return _limiters[provider]
+
+
+def stats():
+    with _limiters_lock:
+        return {name: lim.stats() for name, lim in _limiters.items()}
@@ -0,0 +1,341 @@
+import ast
+import html
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Fields each section's agent must answer with: name -> (type, description).
+# Every section also gets "sources" (URLs) and "notes" (anything that fits no field).
+SECTION_SCHEMAS = {
+    "Company Information": {
+        "website": (str, "Official website URL"),
+        "founded": (str, "Founding date or year"),
+        "founders": (list, "Founder names"),
+        "headquarters": (str, "Headquarters location"),
+        "industry": (str, "Industry"),
+        "subsidiaries": (list, "Subsidiary names"),
+    },
+    "Website Analysis": {
+        "website": (str, "Official website URL"),
+        "structure": (list, "Main sections and pages of the site"),
+        "metadata": (str, "Notable metadata: title, description, keywords"),
+        "technology_stack": (list, "Technologies the site uses"),
+        "tls": (str, "SSL/TLS configuration: protocol, issuer, expiry"),
+    },
+    "Domain and Network Analysis": {
+        "domain": (str, "Primary domain"),
+        "registrar": (str, "Domain registrar"),
+        "registered": (str, "Registration date"),
+        "name_servers": (list, "Name servers"),
+        "dns_records": (list, "DNS records, one per item, e.g. 'MX 10 mail.example.com'"),
+        "subdomains": (list, "Subdomains"),
+        "ip_addresses": (list, "IP addresses of the domain"),
+        "network_services": (list, "Exposed network services, e.g. '443/tcp https'"),
+    },
+    "Social Media and Contact Information": {
+        "social_profiles": (list, "Social media profile URLs"),
+        "emails": (list, "Email addresses"),
+        "phone_numbers": (list, "Phone numbers"),
+        "key_contacts": (list, "Key personnel with their role and contact details"),
+    },
+    "Search Engine Intelligence": {
+        "exposed_documents": (list, "Documents and files found with search operators, with URLs"),
+        "news": (list, "Recent news, one headline with date and URL per item"),
+        "conclusions": (str, "What the findings suggest"),
+    },
+    "Business Information": {
+        "overview": (str, "Short company overview"),
+        "financials": (str, "Revenue, funding, valuation or other financial data"),
+        "key_personnel": (list, "Executives with their roles"),
+        "partnerships": (list, "Partners and partnerships"),
+    },
+    "Regulatory, Legal and Technical Footprint": {
+        "regulatory_filings": (list, "Regulatory filings, e.g. SEC forms"),
+        "legal_issues": (list, "Past or ongoing legal issues"),
+        "security_posture": (str, "Security posture and known vulnerabilities"),
+        "email_patterns": (list, "Email address patterns, e.g. 'first.last@example.com'"),
+    },
+    "Intellectual Property": {
+        "patents": (list, "Patents"),
+        "trademarks": (list, "Trademarks"),
+        "copyrights": (list, "Significant copyrights"),
+    },
+    "Employee and Hiring Information": {
+        "job_listings": (list, "Current job openings"),
+        "employee_reviews": (str, "Summary of employee reviews, with ratings"),
+    },
+    "Community and Public Perception": {
+        "customer_reviews": (str, "Summary of customer reviews, with ratings"),
+        "forum_discussions": (list, "Notable forum discussions, with URLs"),
+        "sentiment": (str, "Overall public sentiment"),
+    },
+    "Core Information": {
+        "website": (str, "Official website URL"),
+        "overview": (str, "What the company does"),
+        "social_profiles": (list, "LinkedIn, Twitter and Facebook profile URLs"),
+        "recent_news": (list, "Significant news of the last 3-6 months, one per item"),
+        "public_perception": (str, "General public perception"),
+    },
+    "Technical and Legal": {
+        "domain": (str, "Primary domain"),
+        "registrar": (str, "Domain registrar"),
+        "registered": (str, "Registration date"),
+        "website_security": (str, "Website security: TLS certificate, security headers"),
+        "regulatory_legal": (list, "Significant regulatory filings or legal issues"),
+    },
+}
+COMMON_FIELDS = {
+    "sources": (list, "URLs the findings come from"),
+    "notes": (str, "Anything relevant that fits no other key"),
+}
+
+# "template" renders the report from the structured sections; "llm" keeps the report generator agent
+REPORT_MODE = os.getenv("REPORT_MODE", "template")
+REPORT_FORMAT = os.getenv("REPORT_FORMAT", "markdown")
+REPORT_SUMMARY = os.getenv("REPORT_SUMMARY", "").lower() in ("1", "true", "yes")
+REPORT_EXTENSIONS = {"markdown": ".md", "html": ".html", "json": ".json"}
+
+REPAIR_PROMPT = """Convert the following findings about {section} into a single JSON object with exactly these keys:
+{keys}
+Use null for a missing text value and [] for a missing list. Answer with the JSON object only.
+
+Findings:
+{text}"""
+
+SUMMARY_PROMPT = """Write an executive summary of at most {words} words for an OSINT report on the company {company}.
+Use only the structured findings below; do not add facts. Highlight what matters most for a risk or due-diligence reader.
+
+Findings (JSON):
+{data}"""
+
+
+def fields(section):
+    return dict(SECTION_SCHEMAS.get(section, {}), **COMMON_FIELDS)
+
+
+def _describe(section):
+    return "\n".join(f'- "{name}" ({"list of strings" if kind is list else "string"}): {description}'
+                     for name, (kind, description) in fields(section).items())
+
+
+def output_format(section):
+    """``expected_output`` text telling an agent to answer with the section's JSON object."""
+    return ("\nAnswer with a single JSON object and no text around it, with these keys:\n" + _describe(section)
+            + "\nUse null for a value you could not find and [] for an empty list.")
+
+
+def extract_json(text):
+    """The first JSON object in an agent's answer, tolerating code fences, trailing commas and Python literals."""
+    text = re.sub(r"```(?:json)?", "", text or "")
+    start = text.find("{")
+    while start != -1:
+        depth, in_string, escaped = 0, None, False
+        for end in range(start, len(text)):
+            char = text[end]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == in_string:
+                    in_string = None
+            elif char in "\"'":
+                in_string = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    candidate = text[start:end + 1]
+                    for parse in (json.loads, lambda t: json.loads(re.sub(r",\s*([}\]])", r"\1", t)), ast.literal_eval):
+                        try:
+                            value = parse(candidate)
+                        except (ValueError, SyntaxError):
+                            continue
+                        if isinstance(value, dict):
+                            return value
+                    break
+        start = text.find("{", start + 1)
+    return None
+
+
+def _key(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return "; ".join(t for t in (_text(v) for v in value) if t) or None
+    if isinstance(value, dict):
+        if len(value) == 1:
+            return _text(next(iter(value.values())))
+        return "; ".join(f"{k}: {t}" for k, t in ((k, _text(v)) for k, v in value.items()) if t) or None
+    value = str(value).strip()
+    return None if value.lower() in ("", "null", "none", "n/a", "unknown", "not found") else value
+
+
+def _items(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [v for v in re.split(r"\n|;|, (?=[A-Z0-9h])", value)]
+    elif isinstance(value, dict):
+        value = [f"{k}: {_text(v)}" for k, v in value.items() if _text(v)]
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    items = []
+    for item in value:
+        item = _text(item)
+        if item:
+            item = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", item)
+            if item and item not in items:
+                items.append(item)
+    return items
+
+
+def validate(section, data):
+    """Problems with ``data`` against the section's schema; empty when it conforms."""
+    if not isinstance(data, dict):
+        return ["not a JSON object"]
+    schema = fields(section)
+    problems = [f"missing key {name!r}" for name in schema if name not in data]
+    problems += [f"unknown key {name!r}" for name in data if name not in schema]
+    for name, (kind, _) in schema.items():
+        value = data.get(name)
+        if value is not None and not isinstance(value, kind):
+            problems.append(f"{name!r} should be a {'list' if kind is list else 'string'}")
+        elif kind is list and value and not all(isinstance(v, str) for v in value):
+            problems.append(f"{name!r} should only contain strings")
+        elif value and any(_text(v) is None for v in (value if kind is list else [value])):
+            problems.append(f"{name!r} has empty or placeholder values")
+    return problems
+
+
+def repair(section, data):
+    """Coerce ``data`` into the section's schema.
+
+    Keys are matched case- and punctuation-insensitively, values are converted to
+    the field's type, unknown keys are folded into ``notes`` and URLs found anywhere
+    in the values are added to ``sources``.
+    """
+    schema = fields(section)
+    data = {_key(k): v for k, v in (data or {}).items()}
+    repaired = {name: (_items if kind is list else _text)(data.pop(name, None)) for name, (kind, _) in schema.items()}
+    extra = [f"{k.replace('_', ' ')}: {t}" for k, t in ((k, _text(v)) for k, v in data.items()) if t]
+    if extra:
+        repaired["notes"] = "; ".join(filter(None, [repaired["notes"]] + extra))
+    urls = re.findall(r"https?://[^\s'\"<>),\]]+", json.dumps(repaired))
+    repaired["sources"] = list(dict.fromkeys(repaired["sources"] + [u.rstrip(".") for u in urls]))
+    return repaired
+
+
+def parse_section(section, text, llm=None):
+    """Structured data for a section from its agent's answer.
+
+    Falls back to asking ``llm`` to convert a prose answer, and without one (or if
+    that fails too) keeps the prose in ``notes``. An answer that already conforms
+    to the schema is kept as given; anything else is repaired.
+    """
+    data = extract_json(text)
+    if data is None and llm is not None and (text or "").strip():
+        try:
+            data = extract_json(llm.invoke(REPAIR_PROMPT.format(section=section, keys=_describe(section), text=text)))
+        except Exception:
+            data = None
+    if data is None:
+        data = {"notes": text}
+    return data if not validate(section, data) else repair(section, data)
+
+
+def parse_sections(outputs, llm=None, max_workers=4):
+    """``parse_section`` over ``{title: answer}``; only prose answers cost an LLM call, run in parallel."""
+    titles = list(outputs)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(titles, pool.map(lambda t: parse_section(t, outputs[t], llm), titles)))
+
+
+def _compact(sections):
+    """Sections with their empty fields dropped."""
+    return {title: {k: v for k, v in data.items() if v} for title, data in sections.items()}
+
+
+def executive_summary(llm, company, sections, words=200):
+    """Short LLM summary written over the compact structured findings only."""
+    data = json.dumps(_compact(sections), ensure_ascii=False, separators=(",", ":"))
+    return llm.invoke(SUMMARY_PROMPT.format(words=words, company=company, data=data)).strip()
+
+
+def _label(name):
+    return {"tls": "TLS", "dns_records": "DNS records", "ip_addresses": "IP addresses"}.get(
+        name, name.replace("_", " ").capitalize())
+
+
+def render_section_markdown(section, data):
+    lines = []
+    for name in fields(section):
+        value = data.get(name)
+        if name in ("notes", "sources"):
+            continue
+        if isinstance(value, list):
+            lines.append(f"- **{_label(name)}:**" + ("" if value else " Not found"))
+            lines.extend(f"  - {item}" for item in value)
+        else:
+            lines.append(f"- **{_label(name)}:** {value or 'Not found'}")
+    if data.get("notes"):
+        lines.append(f"\n{data['notes']}")
+    if data.get("sources"):
+        lines.append("\n**Sources:**")
+        lines.extend(f"- {url}" for url in data["sources"])
+    return "\n".join(lines)
+
+
+def render_markdown(company, sections, summary=None):
+    parts = [f"# OSINT Report: {company}"]
+    if summary:
+        parts.append(f"## Executive Summary\n\n{summary}")
+    parts.extend(f"## {title}\n\n{render_section_markdown(title, data)}" for title, data in sections.items())
+    return "\n\n".join(parts) + "\n"
+
+
+def render_html(company, sections, summary=None):
+    def value_html(value):
+        if isinstance(value, list):
+            return "<ul>" + "".join(f"<li>{_link(v)}</li>" for v in value) + "</ul>" if value else "<p>Not found</p>"
+        return f"<p>{_link(value) if value else 'Not found'}</p>"
+
+    def _link(text):
+        escaped = html.escape(text)
+        return re.sub(r"(https?://[^\s&<]+)", r'<a href="\1">\1</a>', escaped)
+
+    body = [f"<h1>OSINT Report: {html.escape(company)}</h1>"]
+    if summary:
+        body.append(f"<h2>Executive Summary</h2>\n<p>{html.escape(summary)}</p>")
+    for title, data in sections.items():
+        body.append(f"<h2>{html.escape(title)}</h2>\n<dl>")
+        for name in fields(title):
+            if name == "notes" and not data.get(name):
+                continue
+            body.append(f"<dt>{html.escape(_label(name))}</dt><dd>{value_html(data.get(name))}</dd>")
+        body.append("</dl>")
+    return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>OSINT Report: {html.escape(company)}</title></head>\n<body>\n"
+            + "\n".join(body) + "\n</body></html>\n")
+
+
+def render_json(company, sections, summary=None):
+    return json.dumps({"company": company, "executive_summary": summary, "sections": sections},
+                      indent=2, ensure_ascii=False) + "\n"
+
+
+RENDERERS = {"markdown": render_markdown, "html": render_html, "json": render_json}
+
+
+def render(company, sections, fmt=None, summary=None):
+    """Deterministic report from structured sections (``{title: data}``), no LLM involved."""
+    fmt = fmt or REPORT_FORMAT
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {', '.join(RENDERERS)}")
+    return RENDERERS[fmt](company, sections, summary)
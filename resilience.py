@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from tracing import tracer
+
+# Defaults for every provider, overridable per provider as <PROVIDER>_DEADLINE etc.
+SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", 20))  # seconds a search call may take, hedges included
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", 2))  # hedge delay until enough latencies are known for a p95
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.25))
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", 0.1))  # at most this fraction of calls is hedged
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", 5))  # consecutive failures that open the circuit
+CIRCUIT_RESET = float(os.getenv("CIRCUIT_RESET", 30))  # seconds before a trial call is let through
+# Whether a search tool may fall back to the other provider (when that one is configured)
+SEARCH_FALLBACK = os.getenv("SEARCH_FALLBACK", "1").lower() not in ("0", "false", "no")
+
+MIN_SAMPLES = 20
+
+# Attempts run here so the calling agent can stop waiting at its deadline; an abandoned
+# attempt finishes in the background, bounded by the HTTP session's own timeouts
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("SEARCH_ATTEMPT_WORKERS", 32)), thread_name_prefix="search-attempt")
+
+
+class ProviderUnavailable(RuntimeError):
+    """A provider call failed, missed its deadline or was refused by an open circuit."""
+
+
+class CircuitOpen(ProviderUnavailable):
+    pass
+
+
+class DeadlineExceeded(ProviderUnavailable):
+    pass
+
+
+def is_outage(error):
+    """Whether ``error`` means the provider is down or overloaded: a timeout, a connection
+    error or a 429/5xx response. Other errors (a bad request, an invalid key, an error
+    in the response body) say nothing about its health.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, requests.Timeout, requests.ConnectionError)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class CircuitBreaker:
+    """Opens after ``failures`` consecutive failures and fails calls fast for ``reset_timeout``
+    seconds; then one trial call is let through (half-open), which closes or re-opens it.
+    """
+
+    def __init__(self, failures=CIRCUIT_FAILURES, reset_timeout=CIRCUIT_RESET):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial:
+                return False
+            self.trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self._lock:
+            self.consecutive += 1
+            if self.trial or (self.opened_at is None and self.consecutive >= self.failures):
+                self.opened_at = time.monotonic()
+                self.opened += 1
+            self.trial = False
+
+
+class Provider:
+    """Deadline, hedging and circuit breaking for the calls to one search provider.
+
+    ``call(fn)`` runs ``fn`` and, if it hasn't answered after the provider's p95
+    latency, starts an identical hedge request and takes whichever answers first.
+    Hedges are capped at ``hedge_budget`` of all calls so a slow provider isn't
+    sent twice the load. A call that doesn't succeed by its deadline raises
+    ``DeadlineExceeded``; outages (see ``is_outage``) raise ``ProviderUnavailable``
+    and count towards the circuit breaker, which then refuses calls with
+    ``CircuitOpen``. Any other error is raised unchanged.
+    """
+
+    def __init__(self, name, deadline=SEARCH_DEADLINE, hedge_delay=HEDGE_DELAY, min_delay=HEDGE_MIN_DELAY,
+                 hedge_budget=HEDGE_BUDGET, breaker=None, window=200):
+        self.name = name
+        self.deadline = deadline
+        self.default_delay = hedge_delay
+        self.min_delay = min_delay
+        self.hedge_budget = hedge_budget
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadlines = 0
+        self.failed = 0
+        self.short_circuited = 0
+        self.fallbacks = 0
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging: the p95 of recent successful attempts."""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < MIN_SAMPLES:
+            return self.default_delay
+        return max(self.min_delay, samples[int(0.95 * (len(samples) - 1))])
+
+    def _attempt(self, fn):
+        started = time.monotonic()
+        result = fn()
+        with self._lock:
+            self.latencies.append(time.monotonic() - started)
+        return result
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedge_budget <= 0 or self.hedged > self.hedge_budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def call(self, fn, deadline=None):
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpen(f"{self.name} is failing; calls are paused for up to {self.breaker.reset_timeout:g}s")
+        with self._lock:
+            self.calls += 1
+        fn = tracer.bind(fn, tracer.current_agent)
+        started = time.monotonic()
+        timeout = deadline or self.deadline
+        hedge_at = started + min(self.hedge_delay(), timeout)
+        first = _pool.submit(self._attempt, fn)
+        pending, error, hedged = {first}, None, False
+        while pending:
+            now = time.monotonic()
+            if now >= started + timeout:
+                break
+            wake = started + timeout if hedged else min(hedge_at, started + timeout)
+            done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.breaker.success()
+                    if future is not first:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+            if pending and not hedged and time.monotonic() >= hedge_at:
+                hedged = True
+                if self._may_hedge():
+                    pending.add(_pool.submit(self._attempt, fn))
+        if not pending and not is_outage(error):
+            # The provider answered, so it is up; a trial call closes the circuit again
+            self.breaker.success()
+            raise error
+        self.breaker.failure()
+        with self._lock:
+            if pending:
+                self.deadlines += 1
+            else:
+                self.failed += 1
+        if pending:
+            raise DeadlineExceeded(f"{self.name} did not answer within {timeout:g}s")
+        raise ProviderUnavailable(f"{self.name} request failed: {error}") from error
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def stats(self):
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadlines,
+                "failed": self.failed,
+                "short_circuited": self.short_circuited,
+                "fallbacks": self.fallbacks,
+                "hedge_delay_s": round(delay, 3),
+                "circuit": self.breaker.state,
+            }
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def provider(name):
+    """Process-wide resilience settings for provider ``name``, configured from the environment on first use."""
+    with _providers_lock:
+        if name not in _providers:
+            prefix = name.upper()
+            _providers[name] = Provider(
+                name,
+                deadline=float(os.getenv(f"{prefix}_DEADLINE", SEARCH_DEADLINE)),
+                hedge_delay=float(os.getenv(f"{prefix}_HEDGE_DELAY", HEDGE_DELAY)),
+                hedge_budget=float(os.getenv(f"{prefix}_HEDGE_BUDGET", HEDGE_BUDGET)),
+                breaker=CircuitBreaker(int(os.getenv(f"{prefix}_CIRCUIT_FAILURES", CIRCUIT_FAILURES)),
+                                       float(os.getenv(f"{prefix}_CIRCUIT_RESET", CIRCUIT_RESET))),
+            )
+        return _providers[name]
+
+
+def stats():
+    with _providers_lock:
+        return {name: p.stats() for name, p in _providers.items()}
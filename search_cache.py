@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Default time-to-live (seconds) for each cached tool call. Page contents change
+# far less often than search rankings, so they are kept around longer.
+DEFAULT_TTLS = {
+    "exa.search": 6 * 3600,
+    "exa.find_similar": 24 * 3600,
+    "exa.get_contents": 7 * 24 * 3600,
+    "serper.search": 6 * 3600,
+    "collector.domain": 24 * 3600,
+}
+
+
+def normalize_query(query):
+    """Lower-case a query and collapse its whitespace so trivial variations share a key."""
+    return " ".join(str(query).lower().split())
+
+
+def normalize_ids(ids):
+    """Order-independent key for a list of Exa document ids."""
+    return ",".join(sorted(str(i).strip() for i in ids))
+
+
+class SearchCache:
+    """SQLite-backed TTL cache with LRU eviction shared by the search tools.
+
+    Entries are stored per namespace (e.g. ``exa.search``) under a normalized key.
+    The database is opened per operation so the cache is safe to share between the
+    threads of a crew and between separate processes.
+    """
+
+    def __init__(self, path=None, max_entries=None, ttls=None, enabled=None):
+        self.path = path or os.getenv("SEARCH_CACHE_PATH", os.path.join(".osint_cache", "search.sqlite"))
+        self.max_entries = int(max_entries or os.getenv("SEARCH_CACHE_MAX_ENTRIES", 5000))
+        self.ttls = dict(DEFAULT_TTLS)
+        for namespace in self.ttls:
+            env_ttl = os.getenv("SEARCH_CACHE_TTL_" + namespace.replace(".", "_").upper())
+            if env_ttl:
+                self.ttls[namespace] = int(env_ttl)
+        self.ttls.update(ttls or {})
+        if enabled is None:
+            enabled = os.getenv("SEARCH_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL)""")
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(namespace, key):
+        return namespace + ":" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, namespace, key):
+        """Return ``(found, value)`` for a cached entry, counting the hit or miss."""
+        if not self.enabled:
+            return False, None
+        now = time.time()
+        db_key = self._key(namespace, key)
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (db_key,)).fetchone()
+            if row and row[1] > now:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, db_key))
+            elif row:
+                conn.execute("DELETE FROM entries WHERE key = ?", (db_key,))
+                row = None
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return (True, json.loads(row[0])) if row else (False, None)
+
+    def set(self, namespace, key, value, ttl=None):
+        if not self.enabled:
+            return
+        now = time.time()
+        ttl = self.ttls.get(namespace, 3600) if ttl is None else ttl
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self._key(namespace, key), namespace, json.dumps(value), now + ttl, now))
+            count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > self.max_entries:
+                count -= conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,))
+
+    def cached(self, namespace, key, fetch, ttl=None):
+        """Return the cached value for ``key`` or call ``fetch()`` and store its result."""
+        found, value = self.get(namespace, key)
+        if found:
+            return value
+        value = fetch()
+        self.set(namespace, key, value, ttl)
+        return value
+
+    def clear(self):
+        if self.enabled:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,102 @@
+import json
+import os
+
+# Profile run when no sections are asked for; "full" is every section of the crew
+SECTION_PROFILE = os.getenv("SECTION_PROFILE", "full")
+
+
+class SectionSpec:
+    """Declaration of one research section: its agent, its task and what it needs.
+
+    ``task`` is the task description (formatted with ``company``) and
+    ``expected_output`` what the task must deliver. ``tools`` names tool groups the
+    crew script resolves to tools. ``max_iterations`` caps the agent's loop (crewai's
+    ``max_iter``; unset keeps crewai's default) and ``token_budget`` the section's
+    share of the report context. The output of the
+    sections in ``depends_on`` is handed to the task, so they are always run with it.
+    """
+
+    def __init__(self, title, name, role, goal, backstory, task, expected_output, tools=(),
+                 max_iterations=None, token_budget=None, depends_on=()):
+        self.title = title
+        self.name = name
+        self.role = role
+        self.goal = goal
+        self.backstory = backstory
+        self.task = task
+        self.expected_output = expected_output
+        self.tools = tuple(tools)
+        self.max_iterations = max_iterations
+        self.token_budget = token_budget
+        self.depends_on = tuple(depends_on)
+
+    @property
+    def agent_name(self):
+        """Name the agent's LLM is traced and routed under."""
+        return f"{self.name}_agent"
+
+    def __repr__(self):
+        return f"SectionSpec({self.title!r})"
+
+
+class SectionRegistry:
+    """The sections a crew can run, and named profiles selecting a few of them.
+
+    ``select`` resolves a profile name or a list of sections (titles or short names,
+    case-insensitive) into the specs to build: dependencies are added, and sections
+    come in declaration order with every dependency ahead of the sections needing it.
+    ``SECTION_PROFILES`` adds or overrides profiles as JSON (``{"name": [sections]}``).
+    """
+
+    def __init__(self, sections=(), profiles=None):
+        self.sections = {}
+        for spec in sections:
+            self.add(spec)
+        self.profiles = {"full": None}
+        self.profiles.update(profiles or {})
+        self.profiles.update(json.loads(os.getenv("SECTION_PROFILES", "{}")))
+
+    def add(self, spec):
+        self.sections[spec.title] = spec
+        return spec
+
+    def get(self, section):
+        key = " ".join(str(section).lower().split())
+        for spec in self.sections.values():
+            if key in (spec.title.lower(), spec.name.lower()):
+                return spec
+        raise KeyError(f"Unknown section {section!r}; choose from: {', '.join(self.sections)}")
+
+    def profile(self, name):
+        """Section titles of profile ``name``."""
+        if name not in self.profiles:
+            raise KeyError(f"Unknown profile {name!r}; choose from: {', '.join(self.profiles)}")
+        return list(self.sections) if self.profiles[name] is None else list(self.profiles[name])
+
+    def select(self, profile=None, sections=None):
+        """Specs for ``sections`` if given, else for ``profile`` (default ``SECTION_PROFILE``)."""
+        wanted = sections or self.profile(profile or SECTION_PROFILE)
+        depth = {}
+
+        def visit(spec, path=()):
+            if spec.title in path:
+                raise ValueError(f"Circular section dependency: {' -> '.join(path + (spec.title,))}")
+            if spec.title not in depth:
+                depth[spec.title] = 1 + max((visit(self.get(d), path + (spec.title,)) for d in spec.depends_on), default=-1)
+            return depth[spec.title]
+
+        for section in wanted:
+            visit(self.get(section))
+        order = list(self.sections)
+        # Independent sections first, so their tasks are all started before a dependent one waits
+        return [self.sections[t] for t in sorted(depth, key=lambda t: (depth[t], order.index(t)))]
+
+    def describe(self):
+        """Profiles and sections, for ``--list-sections``."""
+        lines = ["Profiles:"]
+        lines.extend(f"  {name:<14} {', '.join(self.profile(name))}" for name in self.profiles)
+        lines.append("Sections:")
+        for spec in self.sections.values():
+            needs = f" (needs {', '.join(spec.depends_on)})" if spec.depends_on else ""
+            lines.append(f"  {spec.name:<34} {spec.title}{needs}")
+        return "\n".join(lines)
@@ -0,0 +1,89 @@
+import re
+import threading
+
+_known_companies = set()
+_companies_lock = threading.Lock()
+
+
+def register_company(company):
+    """Remember a company name so queries mentioning it normalize to the same key."""
+    name = " ".join(str(company).lower().split())
+    if name:
+        with _companies_lock:
+            _known_companies.add(name)
+
+
+def coalesce_key(query):
+    """Normalize a search query for in-flight deduplication.
+
+    Only case and whitespace are ignored, and a known company name standing as its
+    own term is moved to the front, so "Acme official website" and "official website
+    ACME" share a key. Operators, negations, quoted phrases and domains are kept as
+    they are (the name inside ``site:acme.com`` or ``"acme"`` is not moved), since
+    they change what a search returns.
+    """
+    text = " ".join(str(query).lower().split())
+    with _companies_lock:
+        companies = sorted(_known_companies, key=len, reverse=True)
+    for company in companies:
+        pattern = r"(?<!\S)" + re.escape(company) + r"(?!\S)"
+        if re.search(pattern, text):
+            rest = " ".join(re.sub(pattern, " ", text, count=1).split())
+            return f"{company} {rest}".strip()
+    return text
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is still
+    in flight wait for and share its result (or exception) instead of issuing their
+    own request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.saved = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.saved += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.saved = 0
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.saved}
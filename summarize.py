@@ -0,0 +1,128 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Token budgets for the report generator's context. Per-section overrides can be
+# given as JSON in SECTION_TOKEN_BUDGETS, e.g. {"Company Information": 800}.
+SECTION_TOKEN_BUDGET = int(os.getenv("SECTION_TOKEN_BUDGET", 600))
+REPORT_CONTEXT_TOKENS = int(os.getenv("REPORT_CONTEXT_TOKENS", 6000))
+SECTION_WAIT_TIMEOUT = float(os.getenv("SECTION_WAIT_TIMEOUT", 600))
+
+COMPRESS_PROMPT = """Condense the following {section} findings about the company {company} into at most {words} words.
+Keep every concrete fact: names, dates, locations, URLs, numbers, email addresses and sources. Drop repetition, filler and speculation.
+Answer with the condensed findings only.
+
+Findings:
+{text}"""
+
+
+def count_tokens(text):
+    """Approximate llama-style token count (no tokenizer needed): about 4 characters or 0.75 words per token."""
+    text = text or ""
+    return max(len(text) // 4, int(len(text.split()) * 4 / 3))
+
+
+def truncate_to_tokens(text, budget):
+    """Cut ``text`` to roughly ``budget`` tokens, at a sentence boundary when possible."""
+    if count_tokens(text) <= budget:
+        return text
+    limit = budget * 4
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind("\n"))
+    return (cut[:end + 1] if end > limit // 2 else cut).rstrip() + " [...]"
+
+
+class SectionsIncomplete(RuntimeError):
+    """Research sections whose task failed or timed out; the run can be resumed to re-run them."""
+
+    def __init__(self, sections):
+        self.sections = list(sections)
+        super().__init__(f"Sections did not complete: {', '.join(self.sections)}")
+
+
+class SectionOutputs:
+    """Collects research task outputs through their ``callback`` as each task completes."""
+
+    def __init__(self):
+        self.outputs = {}
+        self._cond = threading.Condition()
+
+    def record(self, section, text):
+        with self._cond:
+            self.outputs[section] = text
+            self._cond.notify_all()
+
+    def callback(self, section, then=None):
+        def record(output):
+            self.record(section, output.raw_output)
+            if then is not None:
+                then(output)
+        return record
+
+    def wait(self, sections, timeout=SECTION_WAIT_TIMEOUT, tasks=()):
+        """Block until every section reported; returns outputs in ``sections`` order.
+
+        ``tasks`` are the crew's tasks: the threads of async ones are joined first, and
+        once they have all ended a section that still hasn't reported has failed (an
+        agent that raises never calls back). Raises ``SectionsIncomplete`` for sections
+        missing then, or after ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        threads = [t.thread for t in tasks if getattr(t, "thread", None) is not None]
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if threads and not any(thread.is_alive() for thread in threads):
+            deadline = time.monotonic()
+        with self._cond:
+            self._cond.wait_for(lambda: all(s in self.outputs for s in sections), max(0.0, deadline - time.monotonic()))
+            missing = [s for s in sections if s not in self.outputs]
+            if missing:
+                raise SectionsIncomplete(missing)
+            return {s: self.outputs[s] for s in sections}
+
+
+class SectionCompressor:
+    """Map-reduce stage that bounds the report generator's context.
+
+    Map: every section over its token budget is condensed by the LLM, in parallel.
+    Reduce: the sections are assembled under headings and, if the total is still
+    over ``total_budget``, each is trimmed proportionally to its budget.
+    """
+
+    def __init__(self, llm, budgets=None, default_budget=SECTION_TOKEN_BUDGET,
+                 total_budget=REPORT_CONTEXT_TOKENS, max_workers=4):
+        self.llm = llm
+        self.default_budget = default_budget
+        self.total_budget = total_budget
+        self.max_workers = max_workers
+        # ``budgets`` are per-section defaults (e.g. from the section registry); the env wins
+        self.budgets = dict(budgets or {})
+        self.budgets.update(json.loads(os.getenv("SECTION_TOKEN_BUDGETS", "{}")))
+
+    def budget(self, section):
+        return int(self.budgets.get(section, self.default_budget))
+
+    def compress(self, company, section, text):
+        budget = self.budget(section)
+        if count_tokens(text) <= budget:
+            return text
+        prompt = COMPRESS_PROMPT.format(section=section, company=company, words=int(budget * 0.75), text=text)
+        try:
+            condensed = self.llm.invoke(prompt).strip()
+        except Exception:
+            condensed = text
+        return truncate_to_tokens(condensed or text, budget)
+
+    def build_context(self, company, sections):
+        """Condense ``sections`` ({title: output}) and assemble them into one bounded context."""
+        titles = list(sections)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            condensed = dict(zip(titles, pool.map(lambda t: self.compress(company, t, sections[t]), titles)))
+        total = sum(count_tokens(text) for text in condensed.values())
+        if total > self.total_budget:
+            scale = self.total_budget / sum(self.budget(t) for t in titles)
+            condensed = {t: truncate_to_tokens(text, max(50, int(self.budget(t) * scale))) for t, text in condensed.items()}
+        return "\n\n".join(f"## {title}\n" + re.sub(r"\n{3,}", "\n\n", text.strip()) for title, text in condensed.items())
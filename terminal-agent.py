@@ -1,11 +1,34 @@
+import argparse
+import functools
+import json
 import os
-from exa_py import Exa
+import threading
 from dotenv import load_dotenv
 from langchain.agents import tool
 from textwrap import dedent
 from crewai import Agent, Crew, Task
-from langchain_community.llms import Ollama  # NEW IMPORT
 from langchain_core.prompts import PromptTemplate # NEW IMPORT
+import concurrency
+from batch import read_companies, run_batch
+from checkpoint import Checkpoint
+from collectors import DomainCollector, domain_from, format_facts
+from dedup import Deduplicator, canonical_url
+from llm_cache import cached_ollama
+from loop_control import IterationController
+from doc_store import DocumentStore
+from http_client import SERPER_URL, get_exa, get_session, raise_for_outage
+from passages import parse_ids, select_passages
+from prefetch import Prefetcher
+from report import REPORT_EXTENSIONS, REPORT_FORMAT, REPORT_MODE, REPORT_SUMMARY, executive_summary, output_format, parse_sections, render
+import rate_limit
+import resilience
+from resilience import SEARCH_FALLBACK, ProviderUnavailable
+from search_cache import SearchCache, normalize_ids, normalize_query
+from sections import SectionRegistry, SectionSpec
+from summarize import SectionCompressor, SectionOutputs, SectionsIncomplete
+from singleflight import SingleFlight, coalesce_key, register_company
+from tracing import tracer
+from warehouse import Warehouse
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,8 +36,31 @@ load_dotenv()
 # Load API keys from environment variables or .env file
 os.environ["EXA_API_KEY"] = os.getenv("EXA_API_KEY")
 
+# On-disk cache for Exa results so repeat analyses don't hit the API again
+search_cache = SearchCache()
+
+# Identical searches issued concurrently by different agents share one API call
+search_flight = SingleFlight()
+
+# Collapses duplicate results (tracking params, mirrors, syndicated copies) before agents see them
+deduplicator = Deduplicator()
+
+# Ends an agent's tool loop early when it repeats itself, stops finding anything new or runs over budget
+loop_controller = IterationController()
+
+# Full-text index of everything gathered during a run, for later agents to retrieve
+doc_store = DocumentStore()
+
+# Every finished analysis is kept for queries across companies (`python warehouse.py`)
+warehouse = Warehouse()
+
 # Initialize Ollama with Llama3 (ensure you have it pulled: `ollama pull llama3`)
-ollama_llm = Ollama(model="llama3.1") # NEW CODE
+# Responses are cached on disk when generation is deterministic (see llm_cache.py)
+ollama_llm = cached_ollama(model="llama3.1") # NEW CODE
+
+def agent_llm(agent):
+    """The LLM an agent runs on, with its generations traced under the agent's name."""
+    return tracer.traced_llm(ollama_llm.routed(agent), agent)
 
 prompt_template = PromptTemplate.from_template("""{backstory}
 
@@ -28,48 +74,103 @@ prompt_template = PromptTemplate.from_template("""{backstory}
     {agent_scratchpad}""") # NEW CODE
 
 class ExaSearchTool:
+    # Most recent search query per agent thread, used to rank get_contents passages
+    _recent = threading.local()
+
     @tool
+    @loop_controller.guard
     def search(query: str):
         """Search for a webpage based on the query."""
-        results = ExaSearchTool._exa().search(f"{query}", use_autoprompt=True, num_results=10).results
-        # Adapt the results to the expected format
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "title": result.title,
-                "url": result.url,
-                "id": result.id
-            })
-        return formatted_results
+        ExaSearchTool._recent.query = query
+        try:
+            results = ExaSearchTool._search(query)
+        except ProviderUnavailable as e:
+            return f"Search is unavailable right now ({e}). Continue with what you have found so far."
+        return ExaSearchTool._unique(results)
+
+    @staticmethod
+    def _search(query):
+        """Exa results for ``query`` as dicts with ``title``, ``url`` and ``id``, Serper's while Exa is unavailable."""
+        def fetch():
+            results = resilience.provider("exa").call(
+                lambda: ExaSearchTool._exa().search(f"{query}", use_autoprompt=True, num_results=10).results)
+            # Adapt the results to the expected format
+            formatted_results = []
+            for result in results:
+                formatted_results.append({
+                    "title": result.title,
+                    "url": result.url,
+                    "id": result.id
+                })
+            return formatted_results
+        try:
+            results = ExaSearchTool._cached("exa.search", normalize_query(query), fetch, flight_key=coalesce_key(query))
+        except ProviderUnavailable:
+            results = ExaSearchTool._serper_fallback(query)
+            if results is None:
+                raise
+        ExaSearchTool._remember("exa.search", [{"url": r["url"], "title": r["title"], "content": r["title"]} for r in results])
+        return results
 
     @tool
+    @loop_controller.guard
     def find_similar(url: str):
         """Search for webpages similar to a given URL.
         The url passed in should be a URL returned from `search`.
         """
-        results = ExaSearchTool._exa().find_similar(url, num_results=10)
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "title": result.title,
-                "url": result.url,
-                "id": result.id
-            })
-        return formatted_results
+        def fetch():
+            results = resilience.provider("exa").call(lambda: ExaSearchTool._exa().find_similar(url, num_results=10).results)
+            formatted_results = []
+            for result in results:
+                formatted_results.append({
+                    "title": result.title,
+                    "url": result.url,
+                    "id": result.id
+                })
+            return formatted_results
+        try:
+            key = canonical_url(url)
+        except ValueError:  # Exa gets the URL as given; only the cache key needs the canonical form
+            key = url
+        try:
+            results = ExaSearchTool._cached("exa.find_similar", key, fetch)
+        except ProviderUnavailable as e:
+            return f"Finding similar pages is unavailable right now ({e}). Continue with what you have found so far."
+        ExaSearchTool._remember("exa.find_similar", [{"url": r["url"], "title": r["title"], "content": r["title"]} for r in results])
+        return ExaSearchTool._unique(results)
 
     @tool
-    def get_contents(ids: str):
+    @loop_controller.guard
+    def get_contents(ids: str, query: str = ""):
         """Get the contents of a webpage.
         The ids must be passed in as a list, a list of ids returned from `search`.
+        Optionally pass what you are looking for as `query`; only the most relevant passages are returned.
         """
         try:
-            ids = eval(ids)
-            contents_response = ExaSearchTool._exa().get_contents(ids)
+            ids = parse_ids(ids)
+
+            def fetch():
+                contents_response = resilience.provider("exa").call(lambda: ExaSearchTool._exa().get_contents(ids))
+                return [
+                    {"title": result.title, "url": result.url, "text": result.text}
+                    for result in contents_response.results or []
+                ]
+
+            documents = ExaSearchTool._cached("exa.get_contents", normalize_ids(ids), fetch)
+            ExaSearchTool._remember("exa.get_contents", [dict(doc, content=doc["text"]) for doc in documents if doc["text"]])
+            # Mirrors and syndicated copies of pages already read are not sent again
+            unique = deduplicator.filter([doc for doc in documents if doc["text"]], text=lambda doc: doc["text"][:4000], min_words=30, kind="contents")
+            kept = {id(doc) for doc in unique}
+            # Rank passages locally and keep only the best ones within the character budget
+            query = query or getattr(ExaSearchTool._recent, "query", "")
             contents = []
-            if contents_response.results:
-                for result in contents_response.results:
-                    contents.append(f"Title: {result.title}\nURL: {result.url}\nContent: {result.text[:1000] if result.text else 'No content'}")
-            return "\n\n".join(contents)
+            for doc in select_passages(unique, query):
+                contents.append(f"Title: {doc['title']}\nURL: {doc['url']}\nContent: " + "\n[...]\n".join(doc["passages"]))
+            contents.extend(f"URL: {doc['url']} (same content as a page already returned)"
+                            for doc in documents if doc["text"] and id(doc) not in kept)
+            return "\n\n".join(contents) or "No content"
+        except ProviderUnavailable as e:
+            return f"Page contents are unavailable right now ({e}). Continue with what you have found so far."
         except Exception as e:
             return f"Error processing content IDs: {e}"
 
@@ -79,192 +180,149 @@ class ExaSearchTool:
 
     @staticmethod
     def _exa():
-        return Exa(api_key=os.environ["EXA_API_KEY"])
-
-class OsintAgents():
-    def CompanyInfo_agent(self):
-        return Agent(
-            role='Company Information Specialist',
-            goal='Conduct thorough research on the company,its website, founded date, founders, Headquarter location, industry and Subsidiaries.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-                     As a Company Research Specialist, your mission is to uncover detailed information
-            about the company, what is the company is all about, its official website and url of website, founded date of the company, founders names, location of the headquarter, industry of the company and its subsidiaries.
-            Your insights will provide a comprehensive overview of the company's background."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+        return get_exa()
 
-    def WebsiteAnalysis_agent(self):
-        return Agent(
-            role='Website Analyst',
-            goal='Analyze the official Website of the company its key information',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-                     As a Website Analyst, your analysis will focus on the company's website Structure like its sections and pages information, its proper metadata analysis, use tools like BuiltWith to identify Technology stack used in the company's website. Also find out the SSL/TLS configuration.
-           Your will provide the detailed analysis of the companys website."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+    @staticmethod
+    def _serper_fallback(query):
+        """Serper results for ``query`` in Exa's format while Exa is unavailable, or ``None``."""
+        if not (SEARCH_FALLBACK and os.getenv("SERPER_API_KEY")):
+            return None
+        def fetch():
+            response = get_session().post(SERPER_URL, headers={"X-API-KEY": os.getenv("SERPER_API_KEY")}, json={"q": query})
+            raise_for_outage(response)
+            data = response.json()
+            if "error" in data:
+                raise ValueError(data["error"])
+            return data.get("organic", [])
+        try:
+            # Same cache entries as the web app's Serper tool
+            organic = ExaSearchTool._cached("serper.search", normalize_query(query),
+                                            lambda: resilience.provider("serper").call(fetch), flight_key=coalesce_key(query))
+        except Exception:  # the fallback is best effort; the caller reports the first provider's outage
+            return None
+        resilience.provider("exa").record_fallback()
+        # Exa accepts a page's URL as its id, so get_contents still works on these
+        return [{"title": r.get("title", ""), "url": r.get("link", ""), "id": r.get("link", "")} for r in organic]
 
-    def NetworkAnalysis_agent(self):
-        return Agent(
-            role='Domain and Network Analyst',
-            goal='Analyze the Domain Registration Details, DNS Records, Subdomains, IP Address official Website and Network Services.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As Domain and Network Analyst, your analyis will focus on Domain Registration Details of the website use tools like whois, you will provide the DNS records using DNSdumster, you will provide the subdomains by using google dorking techniques,
-           you will also provide the IP Address associated with the domain and provide the Network services by using the tool shodan."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+    @staticmethod
+    def _unique(results):
+        unique = deduplicator.filter(results)
+        if results and not unique:
+            return f"No new results: all {len(results)} results were already returned to you."
+        return unique
 
-    def SocialMediaAndContact_agent(self):
-        return Agent(
-            role='Social Media and Contact Information Specialist',
-            goal='Gather detailed information about the company\'s social media presence and contact details, including phone numbers, email addresses, and key personnel contact information.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As a Social Media and Contact Information Specialist, your mission is to uncover the company\'s presence on social media platforms like LinkedIn, Facebook, Twitter, GitHub, Instagram, and others.
-                 Additionally, gather comprehensive contact information including phone numbers, email addresses, and any available contact details of key personnel working in the organization."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+    @staticmethod
+    def _remember(source, documents):
+        """Index gathered documents under the company and run the calling agent works for."""
+        run = tracer.current_run
+        if run is not None and documents:
+            doc_store.add(run.name, run.trace_id, source, documents)
 
-    def SearchEngineIntelligence_agent(self):
-        return Agent(
-            role='Search Engine Intelligence Specialist',
-            goal='Use Google Dorking techniques to uncover hidden information like PDFs and confidential files, and find recent news articles about the company.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As a Search Engine Intelligence Specialist, your mission is to uncover hidden information about the company using Google Dorking techniques.
-             You will also gather and analyze recent news articles about the company, deriving conclusions from the findings."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+    @staticmethod
+    def _cached(namespace, key, fetch, flight_key=None):
+        """Serve a tool call from the cache, sharing identical in-flight calls, and trace it.
 
-    def BusinessInformation_agent(self):
-        return Agent(
-            role='Business Information Specialist',
-            goal='Gather comprehensive business information about the company including company overview, financial information, key personnel, and partnerships',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As a Business Information Specialist, your mission is to gather detailed business information from various sources.
-             You will provide an overview of the company, financial data, information about key personnel, and details of company partnerships."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+        The span's ``cache_hit`` is False only for the call that actually hit the API.
+        """
+        with tracer.span("tool", namespace, key=key) as span:
+            span.attrs["cache_hit"] = True
 
-    def RegulatoryLegalTechnicalFootprint_agent(self):
-        return Agent(
-            role='Regulatory, Legal, and Technical Footprint Specialist',
-            goal='Gather information about the company’s regulatory filings, legal issues, security posture, and email patterns.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As a Regulatory, Legal, and Technical Footprint Specialist, your mission is to gather information on the company’s regulatory filings and legal issues, and assess its technical footprint.
-             This includes identifying vulnerabilities and email patterns using various tools."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+            def miss():
+                span.attrs["cache_hit"] = False
+                return fetch()
 
-    def IntellectualProperty_agent(self):
-        return Agent(
-            role='Intellectual Property Specialist',
-            goal='Gather information about the company’s patents, trademarks, and copyrights.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As an Intellectual Property Specialist, your mission is to uncover and document the company’s intellectual property assets.
-             This includes registered patents, trademarks, and significant copyrights."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+            result = search_flight.do(
+                namespace + ":" + (flight_key or key),
+                lambda: search_cache.cached(namespace, key, miss))
+            span.attrs["payload_bytes"] = len(json.dumps(result))
+            return result
 
-    def EmployeeHiringInformation_agent(self):
-        return Agent(
-            role='Employee and Hiring Information Specialist',
-            goal='Gather information about current job listings and employee reviews of the company.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-           As an Employee and Hiring Information Specialist, your mission is to gather details about the company’s hiring practices and employee experiences.
-             This includes current job openings and reviews from sites like Glassdoor."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+class GatheredDocumentsTool:
+    @tool
+    @loop_controller.guard
+    def search_gathered(query: str):
+        """Search the pages and search results other agents already gathered about the company during this analysis.
+        Use this before searching the web: it is instant and makes no API calls.
+        """
+        run = tracer.current_run
+        if run is None:
+            return "No gathered documents available."
+        return doc_store.retrieve(run.name, query, run_id=run.trace_id) or "Nothing relevant has been gathered yet."
 
-    def CommunityPublicPerception_agent(self):
-        return Agent(
-            role='Community and Public Perception Specialist',
-            goal='Gather customer reviews and forum discussions related to the company.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-             As a Community and Public Perception Specialist, your mission is to gather and analyze public opinions about the company.
-             This includes customer reviews from various platforms and forum discussions."""),
-            verbose=True,
-            llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+    @classmethod
+    def tools(cls):
+        return [cls.search_gathered]
 
-    def OSINTReportGenerator_agent(self):
-        return Agent(
-            role='OSINT Report Generator',
-            goal='Compile all gathered information into a detailed and comprehensive OSINT report.',
-            tools=ExaSearchTool.tools(),
-            backstory=dedent("""\
-             As the OSINT Report Generator, your role is to consolidate the information from various agents, including Company Information, Website Analysis, Domain and Network Analysis, Social Media and Contact Information, Search Engine Intelligence, Business Information, Regulatory and Legal Information, Technical Footprint, Intellectual Property, Employee and Hiring Information, Community and Public Perception, into a detailed and comprehensive OSINT report.
-             This report will provide a thorough overview and analysis of the company."""),
-            verbose=True,
-                        llm=ollama_llm,      # UPDATED/ADDED LINE
-            prompt=prompt_template, # UPDATED/ADDED LINE,
-            max_iterations=5
-        )
+class DomainCollectorTool:
+    @tool
+    @loop_controller.guard
+    def collect_domain_facts(domain: str):
+        """Look up a domain directly: DNS records (A, AAAA, MX, NS, TXT), WHOIS registration, TLS certificate and HTTP headers/technologies.
+        Pass the company's domain or website URL, e.g. `example.com`. Use this instead of searching the web for whois, DNS or SSL details.
+        """
+        domain = domain_from(domain)
+        if not domain or "." not in domain:
+            return f"Not a domain: {domain!r}"
+        facts = ExaSearchTool._cached("collector.domain", domain, lambda: DomainCollector().collect(domain))
+        return format_facts(facts)
 
-class OsintAnalysisTask():
-    def CompanyInfo_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+    @classmethod
+    def tools(cls):
+        return [cls.collect_domain_facts]
+
+# Tool groups a section can ask for by name
+TOOLS = {
+    "exa": ExaSearchTool.tools,
+    "domain": DomainCollectorTool.tools,
+    "gathered": GatheredDocumentsTool.tools,
+}
+
+# Research sections; the report covers whichever of them a run selects
+SECTIONS = SectionRegistry([
+    SectionSpec(
+        "Company Information", "CompanyInfo",
+        role='Company Information Specialist',
+        goal='Conduct thorough research on the company,its website, founded date, founders, Headquarter location, industry and Subsidiaries.',
+        backstory=dedent("""\
+                     As a Company Research Specialist, your mission is to uncover detailed information
+            about the company, what is the company is all about, its official website and url of website, founded date of the company, founders names, location of the headquarter, industry of the company and its subsidiaries.
+            Your insights will provide a comprehensive overview of the company's background."""),
+        task=dedent("""\
                 Conduct comprehensive research on the company named {company}. Gather information about its website, founded date of company, its founders, headquarter location of the company, industry of the company and its subsidiaries.
                 Company Name : {company} """),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A detailed report summarizing key findings about the company,its website, founded date, founders, headquarter,industry and its subsidiaries."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def WebsiteAnalysis_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Website Analysis", "WebsiteAnalysis",
+        role='Website Analyst',
+        goal='Analyze the official Website of the company its key information',
+        backstory=dedent("""\
+                     As a Website Analyst, your analysis will focus on the company's website Structure like its sections and pages information, its proper metadata analysis, use tools like BuiltWith to identify Technology stack used in the company's website. Also find out the SSL/TLS configuration.
+           Your will provide the detailed analysis of the companys website."""),
+        task=dedent("""\
                 Uncover information about the website of company named {company}. find its official website and its structure, review the content of the website, make analysis on its metadata, find the technology stack used in the website take the help fo tools like buitWith to find technology stack, also find the SSL/TLS configuration.
+                The `collect_domain_facts` tool returns the site's TLS configuration, HTTP security headers and detected technologies directly.
 
                 Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A comprehensive report on the company's Website Structure,content review, metadata analysis, technology stack and SSL/TLS configuration."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def NetworkAnalysis_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["domain", "exa"],
+        max_iterations=5,
+        depends_on=["Company Information"],
+    ),
+    SectionSpec(
+        "Domain and Network Analysis", "NetworkAnalysis",
+        role='Domain and Network Analyst',
+        goal='Analyze the Domain Registration Details, DNS Records, Subdomains, IP Address official Website and Network Services.',
+        backstory=dedent("""\
+           As Domain and Network Analyst, your analyis will focus on Domain Registration Details of the website use tools like whois, you will provide the DNS records using DNSdumster, you will provide the subdomains by using google dorking techniques,
+           you will also provide the IP Address associated with the domain and provide the Network services by using the tool shodan."""),
+        task=dedent("""\
                 Uncover information about the Domain name and Network of company named {company}.
+        First find the company's domain, then run the `collect_domain_facts` tool on it: it returns DNS records, whois registration, TLS and HTTP details directly.
         find its domain registration details using tool like 'whois',
         find its dns records using tools like 'DNSdumpster',
         find tis subdomains using dns tools and google dorking techniques,
@@ -272,179 +330,355 @@ class OsintAnalysisTask():
         find different network services using shodan.
 
         Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A comprehensive report on the company's domain registration details, dns records, subdomains, IP addresses and network services."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def SocialMediaAndContact_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["domain", "exa"],
+        max_iterations=5,
+        depends_on=["Company Information"],
+    ),
+    SectionSpec(
+        "Social Media and Contact Information", "SocialMediaAndContact",
+        role='Social Media and Contact Information Specialist',
+        goal='Gather detailed information about the company\'s social media presence and contact details, including phone numbers, email addresses, and key personnel contact information.',
+        backstory=dedent("""\
+           As a Social Media and Contact Information Specialist, your mission is to uncover the company\'s presence on social media platforms like LinkedIn, Facebook, Twitter, GitHub, Instagram, and others.
+                 Additionally, gather comprehensive contact information including phone numbers, email addresses, and any available contact details of key personnel working in the organization."""),
+        task=dedent("""\
                 Gather detailed information about the social media presence and contact details of the company named {company}.
                 Find links to its profiles on platforms like LinkedIn, Facebook, Twitter, GitHub, Instagram, and others.
                 Additionally, gather comprehensive contact information including phone numbers, email addresses, and contact details of key personnel if available.
                 Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A comprehensive report on the company's social media profiles and contact details, including phone numbers, email addresses, and contact information of key personnel."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def SearchEngineIntelligence_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Search Engine Intelligence", "SearchEngineIntelligence",
+        role='Search Engine Intelligence Specialist',
+        goal='Use Google Dorking techniques to uncover hidden information like PDFs and confidential files, and find recent news articles about the company.',
+        backstory=dedent("""\
+           As a Search Engine Intelligence Specialist, your mission is to uncover hidden information about the company using Google Dorking techniques.
+             You will also gather and analyze recent news articles about the company, deriving conclusions from the findings."""),
+        task=dedent("""\
             Use Google Dorking techniques to uncover hidden information like PDFs and confidential files about the company named {company}.
             Also, find recent news articles about the company, analyze them, and derive conclusions.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
             A report on hidden information uncovered using Google Dorking and a summary of recent news articles with analysis and conclusions."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def BusinessInformation_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Business Information", "BusinessInformation",
+        role='Business Information Specialist',
+        goal='Gather comprehensive business information about the company including company overview, financial information, key personnel, and partnerships',
+        backstory=dedent("""\
+           As a Business Information Specialist, your mission is to gather detailed business information from various sources.
+             You will provide an overview of the company, financial data, information about key personnel, and details of company partnerships."""),
+        task=dedent("""\
             Gather comprehensive business information about the company named {company}.
             This includes an overview from business directories like Bloomberg, Crunchbase, LinkedIn, financial information, key personnel details, and information about company partnerships.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
             A detailed report summarizing the company's business information, including company overview, financial data, key personnel, and partnerships"""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def RegulatoryLegalTechnicalFootprint_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Regulatory, Legal and Technical Footprint", "RegulatoryLegalTechnicalFootprint",
+        role='Regulatory, Legal, and Technical Footprint Specialist',
+        goal='Gather information about the company’s regulatory filings, legal issues, security posture, and email patterns.',
+        backstory=dedent("""\
+           As a Regulatory, Legal, and Technical Footprint Specialist, your mission is to gather information on the company’s regulatory filings and legal issues, and assess its technical footprint.
+             This includes identifying vulnerabilities and email patterns using various tools."""),
+        task=dedent("""\
             Gather information about the regulatory filings, legal issues, security posture, and email patterns of the company named {company}.
             This includes checking filings with bodies like the SEC, identifying ongoing or past legal issues, assessing vulnerabilities using tools like Shodan, and finding company email patterns using tools like Hunter.io.
+            Use the `collect_domain_facts` tool on the company's domain for its MX/TXT records, TLS certificate and HTTP security headers.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A comprehensive report on the company's regulatory filings, legal issues, security posture, and email patterns."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def IntellectualProperty_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["domain", "exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Intellectual Property", "IntellectualProperty",
+        role='Intellectual Property Specialist',
+        goal='Gather information about the company’s patents, trademarks, and copyrights.',
+        backstory=dedent("""\
+           As an Intellectual Property Specialist, your mission is to uncover and document the company’s intellectual property assets.
+             This includes registered patents, trademarks, and significant copyrights."""),
+        task=dedent("""\
             Gather information about the intellectual property of the company named {company}.
             This includes any patents registered by the company, trademarks, and significant copyrights.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A detailed report on the company's intellectual property, including patents, trademarks, and copyrights."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def EmployeeHiringInformation_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Employee and Hiring Information", "EmployeeHiringInformation",
+        role='Employee and Hiring Information Specialist',
+        goal='Gather information about current job listings and employee reviews of the company.',
+        backstory=dedent("""\
+           As an Employee and Hiring Information Specialist, your mission is to gather details about the company’s hiring practices and employee experiences.
+             This includes current job openings and reviews from sites like Glassdoor."""),
+        task=dedent("""\
             Gather information about current job listings and employee reviews for the company named {company}.
             This includes job openings from the company’s career page and other job boards, as well as employee reviews from sites like Glassdoor.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A comprehensive report on the company's current job listings and employee reviews"""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def CommunityPublicPerception_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["exa"],
+        max_iterations=5,
+    ),
+    SectionSpec(
+        "Community and Public Perception", "CommunityPublicPerception",
+        role='Community and Public Perception Specialist',
+        goal='Gather customer reviews and forum discussions related to the company.',
+        backstory=dedent("""\
+             As a Community and Public Perception Specialist, your mission is to gather and analyze public opinions about the company.
+             This includes customer reviews from various platforms and forum discussions."""),
+        task=dedent("""\
             Gather customer reviews and forum discussions related to the company named {company}.
             This includes reviews from websites like Trustpilot and Google Reviews, and mentions on forums like Reddit and industry-specific forums.
             Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A report on the company's community and public perception, including customer reviews and forum discussions."""),
+        tools=["exa"],
+        max_iterations=5,
+    ),
+], profiles={
+    "quick": ["Company Information", "Business Information", "Search Engine Intelligence"],
+    "network-only": ["Domain and Network Analysis", "Website Analysis"],
+})
+
+class OsintAgents():
+    def section_agent(self, spec):
+        return Agent(
+            role=spec.role,
+            goal=spec.goal,
+            tools=[t for group in spec.tools for t in TOOLS[group]()],
+            backstory=spec.backstory,
+            verbose=True,
+            llm=agent_llm(spec.agent_name),
+            prompt=prompt_template,
+            # crewai's own default applies when the section doesn't set a cap
+            **({"max_iter": spec.max_iterations} if spec.max_iterations else {})
+        )
+
+    def OSINTReportGenerator_agent(self, sections):
+        return Agent(
+            role='OSINT Report Generator',
+            goal='Compile all gathered information into a detailed and comprehensive OSINT report.',
+            tools=GatheredDocumentsTool.tools() + ExaSearchTool.tools(),
+            backstory=dedent(f"""\
+             As the OSINT Report Generator, your role is to consolidate the information from various agents, including {', '.join(sections)}, into a detailed and comprehensive OSINT report.
+             This report will provide a thorough overview and analysis of the company."""),
+            verbose=True,
+                        llm=agent_llm("OSINTReportGenerator_agent"),      # UPDATED/ADDED LINE
+            prompt=prompt_template, # UPDATED/ADDED LINE,
+            max_iter=5
+        )
+
+class OsintAnalysisTask():
+    def section_task(self, spec, agent, company, context=None, callback=None):
+        return Task(
+            description=spec.task.format(company=company),
+            expected_output=spec.expected_output + output_format(spec.title),
             async_execution=True,
-            agent=agent
+            context=context or None,
+            agent=agent,
+            callback=callback
         )
 
-    def OSINTReportGenerator_task(self, agent, company):
+    def OSINTReportGenerator_task(self, agent, company, sections, research=None, callback=None):
         return Task(
             description=dedent(f"""\
-            Compile all the gathered information, including Company Information, Website Analysis, Domain and Network Analysis, Social Media and Contact Information, Search Engine Intelligence, Business Information, Regulatory and Legal Information, Technical Footprint, Intellectual Property, Employee and Hiring Information, Community and Public Perception, into a concise and comprehensive OSINT report for the company.
+            Compile all the gathered information, including {', '.join(sections)}, into a concise and comprehensive OSINT report for the company.
             Ensure the report is detailed, well-structured, and provides valuable insights.
-            Company Name: {company}"""),
-            expected_output=dedent("""\
-                A detailed and well-structured OSINT report for the company, including sections on Company Information, Website Analysis, Domain and Network Analysis, Social Media and Contact Information, Search Engine Intelligence, Business Information, Regulatory and Legal Information, Technical Footprint, Intellectual Property, Employee and Hiring Information, Community and Public Perception."""),
-            agent=agent
+            Everything the other agents found is indexed: use the `search_gathered` tool to look it up before searching the web.
+            Company Name: {company}""") + (f"\n\nResearch findings from the other agents:\n\n{research}" if research else ""),
+            expected_output=dedent(f"""\
+                A detailed and well-structured OSINT report for the company, including sections on {', '.join(sections)}."""),
+            agent=agent,
+            callback=callback
         )
 
-if __name__ == "__main__":
+def run_analysis(company, run_id=None, resume=False, report_format=None, summarize=REPORT_SUMMARY, profile=None, sections=None):
+    """Run the OSINT crew for one company and return its report.
+
+    Only the research sections of ``profile`` (default ``SECTION_PROFILE``), or the
+    ``sections`` listed, are built and run. Every task's output is checkpointed as it
+    completes. ``run_id`` resumes that run, with the sections it was started with;
+    ``resume`` picks up the company's latest unfinished run, if any. The report is
+    rendered from the structured sections in ``report_format`` (markdown, html or
+    json), led by an LLM executive summary when ``summarize`` is set.
+    """
+    checkpoint = (Checkpoint(run_id=run_id) if run_id else Checkpoint.latest(company) if resume else None) or Checkpoint(company)
+    if checkpoint.finished:
+        return checkpoint.load("report")
+    specs = SECTIONS.select(profile, checkpoint.load("sections") or sections)
+    checkpoint.save("sections", [spec.title for spec in specs])
+    print(f"Run id: {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
+    print(f"Sections: {', '.join(spec.title for spec in specs)}")
+    with tracer.run(checkpoint.company, run_id=checkpoint.run_id) as run:
+        report = _run_crew(checkpoint.company, checkpoint, specs, report_format, summarize)
+    tracer.export(run.trace_id)
+    checkpoint.finish(report)
+    try:
+        warehouse.record(checkpoint, tracer.trace_spans(run.trace_id), doc_store.documents(checkpoint.company, run.trace_id))
+    except Exception as e:  # the report is already saved; the warehouse copy can be re-imported later
+        print(f"Could not record run {checkpoint.run_id} in the warehouse: {e}")
+    tracer.prune()
+    loop_controller.prune()
+    return report
+
+def _run_crew(company, checkpoint, specs, report_format=None, summarize=False):
     tasks = OsintAnalysisTask()
     agents = OsintAgents()
+    register_company(company)
+    sections = SectionOutputs()
+    # The report follows the registry's order, not the dependency order the tasks run in
+    titles = [title for title in SECTIONS.sections if title in {spec.title for spec in specs}]
+
+    # Sections completed by an earlier attempt of this run are restored instead of re-run
+    research_agents, research_tasks, built = [], [], {}
+    for spec in specs:
+        saved = checkpoint.load(spec.title)
+        if saved is not None:
+            sections.record(spec.title, saved)
+            continue
+        agent = agents.section_agent(spec)
+        research_agents.append(agent)
+        # Each task reports its output to `sections` and the checkpoint when it completes
+        task = built[spec.title] = tasks.section_task(
+            spec, agent, company, context=[built[d] for d in spec.depends_on if d in built],
+            callback=checkpoint.callback(spec.title, then=sections.callback(spec.title)))
+        for dependency in spec.depends_on:
+            if dependency not in built:
+                task.description += f"\n\nFindings of the {dependency} section:\n\n{sections.outputs[dependency]}"
+        research_tasks.append(task)
+
+    if research_tasks:
+        # The last task runs in this thread alongside the async ones, so kickoff returns once it is done
+        research_tasks[-1].async_execution = False
+
+        # Look up the canonical facts (official domain, LinkedIn, Wikipedia...) once, concurrently,
+        # and hand them to every agent so none spends its first iterations rediscovering them
+        facts = Prefetcher.format(Prefetcher(ExaSearchTool._search).run(company))
+        if facts:
+            for task in research_tasks:
+                task.description += "\n\n" + facts
+
+        # Create and run the research crew
+        research_crew = Crew(
+            agents=research_agents,
+            tasks=research_tasks,
+            verbose=True,  # You can set it to False if you don't want to see detailed execution logs
+        )
+        research_crew.kickoff()
+
+    # A failed section raises here, before the run is marked finished, so --resume re-runs it
+    outputs = sections.wait(titles, tasks=research_tasks)
+    if REPORT_MODE != "llm":
+        # Validate/repair each section against its schema and render the report without an LLM pass
+        structured = checkpoint.load("structured sections")
+        if structured is None:
+            structured = parse_sections(outputs, llm=agent_llm("SectionParser"))
+            checkpoint.save("structured sections", structured)
+        summary = executive_summary(agent_llm("ExecutiveSummary"), company, structured) if summarize else None
+        return render(company, structured, fmt=report_format, summary=summary)
+
+    # Condense oversized sections in parallel and assemble a bounded context for the report
+    context = checkpoint.load("research context")
+    if context is None:
+        budgets = {spec.title: spec.token_budget for spec in specs if spec.token_budget}
+        context = SectionCompressor(agent_llm("SectionCompressor"), budgets=budgets).build_context(company, outputs)
+        checkpoint.save("research context", context)
+    report_generator_agent = agents.OSINTReportGenerator_agent(titles)
+    report_generator_task = tasks.OSINTReportGenerator_task(report_generator_agent, company, titles, research=context)
+
+    # Create and run the report crew
+    report_crew = Crew(
+        agents=[report_generator_agent],
+        tasks=[report_generator_task],
+        verbose=True,
+    )
+    return report_crew.kickoff()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OSINT analysis of a company")
+    parser.add_argument("--batch", metavar="FILE", help="CSV or JSONL file of company names to analyze")
+    parser.add_argument("--output-dir", default="osint_reports", help="Where batch reports and the manifest are written")
+    parser.add_argument("--workers", type=int, default=2, help="Companies analyzed concurrently in batch mode")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="Run batch workers as threads or processes")
+    parser.add_argument("--llm-concurrency", type=int, help="Maximum simultaneous LLM generations")
+    parser.add_argument("--search-concurrency", type=int, help="Maximum simultaneous search API calls")
+    parser.add_argument("--no-resume", action="store_true", help="Re-analyze companies already completed in the output directory, ignoring checkpoints")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run from its checkpoint")
+    parser.add_argument("--format", choices=["markdown", "html", "json"], default=REPORT_FORMAT, help="Report format")
+    parser.add_argument("--summary", action="store_true", default=REPORT_SUMMARY, help="Start the report with an LLM executive summary of the findings")
+    parser.add_argument("--profile", help=f"Sections to run: {', '.join(SECTIONS.profiles)} (default: SECTION_PROFILE or full)")
+    parser.add_argument("--sections", nargs="+", metavar="SECTION", help="Run only these sections (titles or short names) and what they depend on")
+    parser.add_argument("--list-sections", action="store_true", help="List the profiles and sections and exit")
+    args = parser.parse_args()
+
+    if args.list_sections:
+        print(SECTIONS.describe())
+        raise SystemExit
+    try:
+        SECTIONS.select(args.profile, args.sections)
+    except (KeyError, ValueError) as e:
+        parser.error(e.args[0])
+    if args.resume:
+        try:
+            Checkpoint(run_id=args.resume)
+        except ValueError as e:
+            parser.error(e.args[0])
 
     print("## Welcome to OSINT Analysis of Company")
     print('-------------------------------')
-    company = input("Enter the name of the company: ")
-
-    # Instantiate agents
-    company_info_agent = agents.CompanyInfo_agent()
-    website_analysis_agent = agents.WebsiteAnalysis_agent()
-    network_analysis_agent = agents.NetworkAnalysis_agent()
-    social_media_contact_agent = agents.SocialMediaAndContact_agent()
-    search_engine_intel_agent = agents.SearchEngineIntelligence_agent()
-    business_info_agent = agents.BusinessInformation_agent()
-    regulatory_legal_tech_agent = agents.RegulatoryLegalTechnicalFootprint_agent()
-    intellectual_property_agent = agents.IntellectualProperty_agent()
-    employee_hiring_agent = agents.EmployeeHiringInformation_agent()
-    community_perception_agent = agents.CommunityPublicPerception_agent()
-    report_generator_agent = agents.OSINTReportGenerator_agent()
-
-    # Create tasks
-    company_info_task = tasks.CompanyInfo_task(company_info_agent, company)
-    website_analysis_task = tasks.WebsiteAnalysis_task(website_analysis_agent, company)
-    network_analysis_task = tasks.NetworkAnalysis_task(network_analysis_agent, company)
-    social_media_contact_task = tasks.SocialMediaAndContact_task(social_media_contact_agent, company)
-    search_engine_intel_task = tasks.SearchEngineIntelligence_task(search_engine_intel_agent, company)
-    business_info_task = tasks.BusinessInformation_task(business_info_agent, company)
-    regulatory_legal_tech_task = tasks.RegulatoryLegalTechnicalFootprint_task(regulatory_legal_tech_agent, company)
-    intellectual_property_task = tasks.IntellectualProperty_task(intellectual_property_agent, company)
-    employee_hiring_task = tasks.EmployeeHiringInformation_task(employee_hiring_agent, company)
-    community_perception_task = tasks.CommunityPublicPerception_task(community_perception_agent, company)
-    report_generator_task = tasks.OSINTReportGenerator_task(report_generator_agent, company)
-
-    # Create the crew
-    crew = Crew(
-        agents=[
-            company_info_agent,
-            website_analysis_agent,
-            network_analysis_agent,
-            social_media_contact_agent,
-            search_engine_intel_agent,
-            business_info_agent,
-            regulatory_legal_tech_agent,
-            intellectual_property_agent,
-            employee_hiring_agent,
-            community_perception_agent,
-            report_generator_agent
-        ],
-        tasks=[
-            company_info_task,
-            website_analysis_task,
-            network_analysis_task,
-            social_media_contact_task,
-            search_engine_intel_task,
-            business_info_task,
-            regulatory_legal_tech_task,
-            intellectual_property_task,
-            employee_hiring_task,
-            community_perception_task,
-            report_generator_task
-        ],
-        verbose=True,  # You can set it to False if you don't want to see detailed execution logs
-        max_iterations=10  # Maximum number of iterations for the crew to run
-    )
 
-    # Run the crew
-    report = crew.kickoff()
-
-    print("\n\n-------------------------------")
-    print("## OSINT Analysis Report:")
-    print("-------------------------------")
-    print(report)
-    print("\n\nOSINT analysis complete.")
\ No newline at end of file
+    if args.batch:
+        summary = run_batch(
+            read_companies(args.batch),
+            functools.partial(run_analysis, resume=not args.no_resume, report_format=args.format, summarize=args.summary,
+                              profile=args.profile, sections=args.sections),
+            args.output_dir,
+            workers=args.workers,
+            executor=args.executor,
+            llm_concurrency=args.llm_concurrency,
+            search_concurrency=args.search_concurrency,
+            resume=not args.no_resume,
+            report_ext=REPORT_EXTENSIONS[args.format],
+        )
+        print(f"\nBatch complete: {summary['ok']} succeeded, {summary['failed']} failed. Manifest: {os.path.join(args.output_dir, 'manifest.json')}")
+    else:
+        concurrency.configure("llm", args.llm_concurrency)
+        concurrency.configure("search", args.search_concurrency)
+        company = None if args.resume else input("Enter the name of the company: ")
+        try:
+            report = run_analysis(company, run_id=args.resume, report_format=args.format, summarize=args.summary,
+                                  profile=args.profile, sections=args.sections)
+        except SectionsIncomplete as e:
+            raise SystemExit(f"OSINT analysis incomplete: {e}. Resume it with --resume and the run id printed above.")
+
+        print("\n\n-------------------------------")
+        print("## OSINT Analysis Report:")
+        print("-------------------------------")
+        print(report)
+
+    print(f"\nSearch cache: {search_cache.stats()}")
+    print(f"Coalesced searches: {search_flight.stats()}")
+    print(f"Duplicate results dropped: {deduplicator.stats()['dropped']}")
+    print(f"LLM cache: {ollama_llm.cache.stats() if ollama_llm.cache else 'disabled'}")
+    if ollama_llm.pool:
+        print(f"LLM backends: {ollama_llm.pool.stats()}")
+    print(f"Rate limiting: {rate_limit.stats()}")
+    print(f"Search providers: {resilience.stats()}")
+    print(f"\n{tracer.summary()}")
+    print(f"\n{loop_controller.summary()}")
+    print("\n\nOSINT analysis complete.")
@@ -0,0 +1,91 @@
+import asyncio
+import shutil
+
+import pytest
+
+from collectors import DomainCollector, format_facts, resolve, tls_probe
+from fake_services import FakeDNS, FakeSite, FakeWhois
+
+DOMAIN = "acme.test"
+RECORDS = {
+    DOMAIN: {
+        "A": ["127.0.0.1"],
+        "AAAA": ["::1"],
+        "MX": ["10 mail.acme.test"],
+        "NS": ["ns1.acme.test", "ns2.acme.test"],
+        "TXT": ["v=spf1 include:_spf.acme.test ~all"],
+    },
+    # Enough TXT data that the answer doesn't fit in a 512-byte datagram
+    "big.acme.test": {"TXT": [f"verification-token-{i}-" + "x" * 60 for i in range(10)]},
+}
+WHOIS = {
+    DOMAIN: ("Domain Name: ACME.TEST\r\nRegistrar: Fake Registrar, Inc.\r\nCreation Date: 2001-02-03T00:00:00Z\r\n"
+             "Registry Expiry Date: 2031-02-03T00:00:00Z\r\nName Server: NS1.ACME.TEST\r\nName Server: NS2.ACME.TEST\r\n"),
+}
+
+
+@pytest.fixture
+def dns():
+    server = FakeDNS(RECORDS)
+    yield server
+    server.stop()
+
+
+def test_resolve_over_udp(dns):
+    assert asyncio.run(resolve(DOMAIN, "MX", "127.0.0.1", dns.port)) == ["10 mail.acme.test"]
+    assert asyncio.run(resolve(DOMAIN, "AAAA", "127.0.0.1", dns.port)) == ["::1"]
+    assert dns.calls == {"udp": 2}
+
+
+def test_resolve_retries_truncated_answers_over_tcp(dns):
+    values = asyncio.run(resolve("big.acme.test", "TXT", "127.0.0.1", dns.port))
+    assert values == RECORDS["big.acme.test"]["TXT"]
+    assert dns.calls == {"udp": 1, "tcp": 1}
+
+
+def test_resolve_unknown_name(dns):
+    assert asyncio.run(resolve("missing.acme.test", "A", "127.0.0.1", dns.port)) == []
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is needed to create the test certificate")
+def test_collector_against_local_stand_ins(dns):
+    whois = FakeWhois(WHOIS)
+    site = FakeSite(DOMAIN, headers={"Server": "nginx", "cf-ray": "1", "Strict-Transport-Security": "max-age=1"},
+                    body='<html><head><title>Acme Corp</title></head><body><script src="/wp-content/x.js"></script></body></html>')
+    try:
+        collector = DomainCollector(nameserver="127.0.0.1", dns_port=dns.port, whois_server="127.0.0.1",
+                                    whois_port=whois.port, https_port=site.port, connect_host="127.0.0.1",
+                                    ca_file=site.cert_file, timeout=5)
+        facts = collector.collect(f"https://www.{DOMAIN}/about")
+    finally:
+        whois.stop()
+        site.stop()
+
+    assert facts["domain"] == DOMAIN
+    assert facts["dns"]["A"] == ["127.0.0.1"]
+    assert sorted(facts["dns"]["NS"]) == ["ns1.acme.test", "ns2.acme.test"]
+    assert facts["whois"]["registrar"] == "Fake Registrar, Inc."
+    assert facts["whois"]["name_servers"] == ["ns1.acme.test", "ns2.acme.test"]
+    assert facts["tls"]["verified"] is True
+    assert facts["tls"]["issuer"] == "Fake Site CA"
+    assert facts["tls"]["san"] == [DOMAIN]
+    assert facts["http"]["status"] == 200
+    assert facts["http"]["title"] == "Acme Corp"
+    assert facts["http"]["technologies"] == ["nginx", "Cloudflare", "WordPress"]
+    assert facts["http"]["security_headers"]["strict-transport-security"] is True
+    assert "registrar: Fake Registrar, Inc." in format_facts(facts)
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is needed to create the test certificate")
+def test_tls_probe_reports_certificate_of_unverified_site():
+    site = FakeSite(DOMAIN)
+    try:
+        tls = asyncio.run(tls_probe(DOMAIN, site.port, timeout=5, connect_host="127.0.0.1"))
+    finally:
+        site.stop()
+
+    assert tls["verified"] is False
+    assert tls["verify_error"]
+    assert tls["issuer"] == "Fake Site CA"
+    assert tls["san"] == [DOMAIN]
+    assert tls["days_left"] > 0
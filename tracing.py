@@ -0,0 +1,301 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Finished runs whose spans stay in memory (for summaries) after they have been exported
+TRACE_KEEP_RUNS = int(os.getenv("TRACE_KEEP_RUNS", 20))
+
+
+def _new_id(length):
+    return uuid.uuid4().hex[:length]
+
+
+class Span:
+    def __init__(self, trace_id, kind, name, agent=None, attrs=None):
+        self.trace_id = trace_id
+        self.span_id = _new_id(16)
+        self.kind = kind
+        self.name = name
+        self.agent = agent
+        self.attrs = dict(attrs or {})
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "kind": self.kind,
+            "name": self.name,
+            "agent": self.agent,
+            "start": self.start,
+            "end": self.end,
+            "duration_s": round(self.duration, 4),
+            "attrs": self.attrs,
+        }
+
+
+class LLMTraceHandler(BaseCallbackHandler):
+    """Records one ``llm`` span per generation of an agent's LLM.
+
+    It also marks the current thread as working for that agent, so tool calls the
+    agent makes next are attributed to it.
+    """
+
+    def __init__(self, tracer, agent, trace_id):
+        self.tracer = tracer
+        self.agent = agent
+        self.trace_id = trace_id
+        self._open = {}
+
+    def on_llm_start(self, serialized, prompts, run_id=None, **kwargs):
+        self.tracer._set_context(self.trace_id, self.agent)
+        span = Span(self.trace_id, "llm", "generate", self.agent)
+        span.attrs["prompt_chars"] = sum(len(p) for p in prompts)
+        self._open[run_id] = span
+
+    def on_llm_end(self, response, run_id=None, **kwargs):
+        span = self._open.pop(run_id, None)
+        if span is None:
+            return
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        info = (generation.generation_info or {}) if generation else {}
+        text = generation.text if generation else ""
+        # Ollama reports exact counts; fall back to a rough chars/4 estimate
+        span.attrs["prompt_tokens"] = info.get("prompt_eval_count", span.attrs["prompt_chars"] // 4)
+        span.attrs["completion_tokens"] = info.get("eval_count", len(text) // 4)
+        self.tracer._finish(span)
+
+    def on_llm_error(self, error, run_id=None, **kwargs):
+        span = self._open.pop(run_id, None)
+        if span is not None:
+            span.attrs["error"] = str(error)
+            self.tracer._finish(span)
+
+
+class Tracer:
+    """Collects run, agent, LLM and tool spans and exports them as JSONL or OTLP JSON.
+
+    ``run(company)`` opens a trace in the calling thread. LLMs built for an agent
+    inside it carry an ``LLMTraceHandler`` bound to that trace, and the crew's worker
+    threads pick the trace and agent up from the handler, so concurrent runs in a
+    batch stay separate. Agent spans are derived from their LLM and tool spans.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._runs = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _set_context(self, trace_id, agent):
+        self._local.trace_id = trace_id
+        self._local.agent = agent
+
+    def _finish(self, span):
+        span.end = time.time()
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def current_trace(self):
+        return getattr(self._local, "trace_id", None)
+
+    @property
+    def current_agent(self):
+        return getattr(self._local, "agent", None)
+
+    @property
+    def current_run(self):
+        """The ``run`` span (its name is the company) the calling thread is working for."""
+        return self.run_span(self.current_trace)
+
+    def run_span(self, trace_id):
+        return self._runs.get(trace_id)
+
+    def finished_runs(self):
+        """``run`` spans of the finished runs still held, oldest first."""
+        with self._lock:
+            return sorted((s for s in self.spans if s.kind == "run"), key=lambda s: s.end)
+
+    def prune(self, keep=None):
+        """Forget the spans of all but the ``keep`` (default ``TRACE_KEEP_RUNS``) latest finished runs.
+
+        Call it once a run has been exported; runs still in progress are kept.
+        Returns the trace ids dropped.
+        """
+        keep = TRACE_KEEP_RUNS if keep is None else keep
+        finished = self.finished_runs()
+        dropped = {s.trace_id for s in finished[:max(0, len(finished) - keep)]}
+        if dropped:
+            with self._lock:
+                self.spans = [s for s in self.spans if s.trace_id not in dropped]
+                for trace_id in dropped:
+                    self._runs.pop(trace_id, None)
+        return dropped
+
+    @contextmanager
+    def run(self, name, **attrs):
+        previous = (self.current_trace, getattr(self._local, "agent", None))
+        span = Span(_new_id(32), "run", name, attrs=attrs)
+        self._runs[span.trace_id] = span
+        self._set_context(span.trace_id, None)
+        try:
+            yield span
+        finally:
+            self._finish(span)
+            self._set_context(*previous)
+
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        span = Span(self.current_trace, kind, name, getattr(self._local, "agent", None), attrs)
+        try:
+            yield span
+        except Exception as e:
+            span.attrs["error"] = str(e)
+            raise
+        finally:
+            self._finish(span)
+
+    def bind(self, fn, agent=None):
+        """Wrap ``fn`` to run under the calling thread's trace, e.g. in a worker pool."""
+        trace_id = self.current_trace
+
+        def bound(*args, **kwargs):
+            self._set_context(trace_id, agent)
+            return fn(*args, **kwargs)
+        return bound
+
+    def llm_handler(self, agent):
+        return LLMTraceHandler(self, agent, self.current_trace)
+
+    def traced_llm(self, llm, agent):
+        """Copy of ``llm`` whose generations are recorded as ``agent``'s spans."""
+        return llm.copy(update={"callbacks": list(llm.callbacks or []) + [self.llm_handler(agent)]})
+
+    def agent_spans(self, trace_id, agent):
+        """Finished spans of one agent in one trace."""
+        with self._lock:
+            return [s for s in self.spans if s.trace_id == trace_id and s.agent == agent]
+
+    def trace_spans(self, trace_id=None):
+        """Spans of one trace (all when ``None``) plus derived agent spans."""
+        with self._lock:
+            spans = [s for s in self.spans if trace_id is None or s.trace_id == trace_id]
+        runs = {s.trace_id: s for s in spans if s.kind == "run"}
+        by_agent = defaultdict(list)
+        for s in spans:
+            if s.agent:
+                by_agent[(s.trace_id, s.agent)].append(s)
+        records = [dict(s.to_dict(), parent_id=None) for s in runs.values()]
+        for (trace, agent), children in by_agent.items():
+            agent_span = Span(trace, "agent", agent, agent)
+            agent_span.start = min(c.start for c in children)
+            agent_span.end = max(c.end for c in children)
+            agent_span.attrs = {
+                "llm_calls": sum(1 for c in children if c.kind == "llm"),
+                "tool_calls": sum(1 for c in children if c.kind == "tool"),
+            }
+            run = runs.get(trace)
+            records.append(dict(agent_span.to_dict(), parent_id=run.span_id if run else None))
+            records.extend(dict(c.to_dict(), parent_id=agent_span.span_id) for c in children)
+        run_ids = {trace: run.span_id for trace, run in runs.items()}
+        records.extend(dict(s.to_dict(), parent_id=run_ids.get(s.trace_id))
+                       for s in spans if s.kind != "run" and not s.agent)
+        return records
+
+    def export_jsonl(self, path, trace_id=None):
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.trace_spans(trace_id):
+                f.write(json.dumps(record) + "\n")
+
+    def export_otlp(self, path, trace_id=None, service_name="osint-analysis-tool", merge=False):
+        """Write spans in the OTLP/JSON layout accepted by OpenTelemetry collectors.
+
+        With ``merge`` the spans already in the file at ``path`` are kept.
+        """
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        otlp_spans = []
+        for r in self.trace_spans(trace_id):
+            attrs = dict(r["attrs"], **{"osint.kind": r["kind"]})
+            if r["agent"]:
+                attrs["osint.agent"] = r["agent"]
+            otlp_spans.append({
+                "traceId": r["trace_id"] or "0" * 32,
+                "spanId": r["span_id"],
+                "parentSpanId": r["parent_id"] or "",
+                "name": f"{r['kind']} {r['name']}",
+                "kind": 1,
+                "startTimeUnixNano": str(int(r["start"] * 1e9)),
+                "endTimeUnixNano": str(int((r["end"] or r["start"]) * 1e9)),
+                "attributes": [{"key": k, "value": value(v)} for k, v in attrs.items()],
+            })
+        if merge and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                previous = json.load(f)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            otlp_spans = previous + otlp_spans
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "osint.tracing"}, "spans": otlp_spans}],
+        }]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+
+    def export(self, trace_id=None):
+        """Export to ``TRACE_FILE`` (if set) in ``TRACE_FORMAT`` (``jsonl`` or ``otlp``)."""
+        path = os.getenv("TRACE_FILE")
+        if not path:
+            return None
+        if os.getenv("TRACE_FORMAT", "jsonl").lower() == "otlp":
+            # An OTLP document can't be appended to, so rewrite it with this trace added
+            self.export_otlp(path, trace_id, merge=trace_id is not None)
+        else:
+            self.export_jsonl(path, trace_id)
+        return path
+
+    def summary(self, trace_id=None):
+        """Plain-text table of time, calls, tokens and payload per agent and per tool."""
+        records = self.trace_spans(trace_id)
+        rows = []
+        for r in records:
+            if r["kind"] == "run":
+                rows.append((f"run    {r['name']}", r["duration_s"], "", "", "", "", ""))
+            elif r["kind"] == "agent":
+                llm = [c for c in records if c["kind"] == "llm" and c["agent"] == r["agent"] and c["trace_id"] == r["trace_id"]]
+                rows.append((f"agent  {r['name']}", r["duration_s"], r["attrs"]["llm_calls"] + r["attrs"]["tool_calls"],
+                             sum(c["attrs"].get("prompt_tokens", 0) for c in llm),
+                             sum(c["attrs"].get("completion_tokens", 0) for c in llm), "", ""))
+        tools = defaultdict(list)
+        for r in records:
+            if r["kind"] == "tool":
+                tools[r["name"]].append(r)
+        for name, calls in sorted(tools.items()):
+            rows.append((f"tool   {name}", sum(c["duration_s"] for c in calls), len(calls), "", "",
+                         sum(c["attrs"].get("payload_bytes", 0) for c in calls),
+                         sum(1 for c in calls if c["attrs"].get("cache_hit"))))
+        lines = [f"{'span':<62} {'time s':>9} {'calls':>6} {'prompt tok':>10} {'compl tok':>9} {'bytes':>9} {'cached':>6}"]
+        for name, seconds, calls, prompt_tokens, completion_tokens, payload, cached in rows:
+            lines.append(f"{name[:62]:<62} {seconds:>9.2f} {calls:>6} {prompt_tokens!s:>10} {completion_tokens!s:>9} {payload!s:>9} {cached!s:>6}")
+        return "\n".join(lines)
+
+
+# Process-wide tracer shared by the tools, the LLMs and the entry points
+tracer = Tracer()
@@ -1,12 +1,32 @@
+import json
 import os
-import requests
+import uuid
 from dotenv import load_dotenv
 from langchain.agents import tool
 from textwrap import dedent
 from crewai import Agent, Crew, Task
-from langchain_community.llms import Ollama
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import PromptTemplate
 import streamlit as st
+from checkpoint import Checkpoint
+from collectors import DomainCollector, domain_from, format_facts
+from dedup import Deduplicator
+from llm_cache import cached_ollama
+from loop_control import IterationController
+from doc_store import DocumentStore
+from http_client import SERPER_URL, get_exa, get_session, raise_for_outage
+from job_queue import JobQueue
+from prefetch import Prefetcher
+from report import REPORT_MODE, REPORT_SUMMARY, executive_summary, output_format, parse_section, parse_sections, render, render_section_markdown
+import rate_limit
+import resilience
+from resilience import SEARCH_FALLBACK, ProviderUnavailable
+from search_cache import SearchCache, normalize_query
+from sections import SectionRegistry, SectionSpec
+from singleflight import SingleFlight, coalesce_key, register_company
+from summarize import SectionOutputs
+from tracing import tracer
+from warehouse import Warehouse
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,8 +34,46 @@ load_dotenv()
 # Load API keys
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
-# Initialize Ollama with Llama3
-ollama_llm = Ollama(model="llama3.1")
+@st.cache_resource
+def shared_state():
+    """Caches and controllers shared by every rerun and session of the app.
+
+    Streamlit executes this script again on every interaction; the job queue's
+    workers keep using the objects of the first run, so the stats shown below
+    must come from the same ones.
+    """
+    return {
+        # On-disk cache for Serper results so repeat analyses don't hit the API again
+        "search_cache": SearchCache(),
+        # Identical searches issued concurrently by different agents share one API call
+        "search_flight": SingleFlight(),
+        # Collapses duplicate results (tracking params, mirrors, syndicated copies) before agents see them
+        "deduplicator": Deduplicator(),
+        # Ends an agent's tool loop early when it repeats itself, stops finding anything new or runs over budget
+        "loop_controller": IterationController(),
+        # Full-text index of everything gathered during a run, for later agents to retrieve
+        "doc_store": DocumentStore(),
+        # Every finished analysis is kept for queries across companies (`python warehouse.py`)
+        "warehouse": Warehouse(),
+        # Ollama with Llama3, caching responses when generation is deterministic
+        "ollama_llm": cached_ollama(model="llama3.1"),
+    }
+
+_shared = shared_state()
+search_cache = _shared["search_cache"]
+search_flight = _shared["search_flight"]
+deduplicator = _shared["deduplicator"]
+loop_controller = _shared["loop_controller"]
+doc_store = _shared["doc_store"]
+warehouse = _shared["warehouse"]
+ollama_llm = _shared["ollama_llm"]
+
+def agent_llm(agent, callbacks=None):
+    """The LLM an agent runs on, with its generations traced under the agent's name."""
+    llm = tracer.traced_llm(ollama_llm.routed(agent), agent)
+    if callbacks:
+        llm = llm.copy(update={"callbacks": llm.callbacks + list(callbacks)})
+    return llm
 
 # Define a more structured prompt template
 prompt_template = PromptTemplate.from_template("""{backstory}
@@ -29,8 +87,12 @@ prompt_template = PromptTemplate.from_template("""{backstory}
 
     {agent_scratchpad}""")
 
+class SerperError(Exception):
+    """Error reported in a Serper API response body."""
+
 class SerperSearchTool:
     @tool
+    @loop_controller.guard
     def search(query: str) -> str:
         """Perform a web search using Serper API.
 
@@ -40,69 +102,172 @@ class SerperSearchTool:
         Returns:
             str: Search results or error message
         """
+        try:
+            found = SerperSearchTool._search(query)
+            if not found:
+                return "No relevant results found."
+            results = deduplicator.filter(found)
+            if not results:
+                return f"No new results: all {len(found)} results were already returned to you."
+            summary = "\n\n".join([f"- {r['title']} - {r['snippet']}" for r in results[:3]])
+            return f"Top results:\n\n{summary}"
+        except ProviderUnavailable as e:
+            return f"Search is unavailable right now ({e}). Continue with what you have found so far."
+        except Exception as e:
+            return f"Error calling Serper: {e}"
+
+    @staticmethod
+    def _search(query):
+        """Organic Serper results for ``query`` as dicts with ``title``, ``url`` and ``snippet``."""
         headers = {
             "X-API-KEY": SERPER_API_KEY,
             "Content-Type": "application/json"
         }
         body = {"q": query}
-        try:
-            response = requests.post("https://google.serper.dev/search", headers=headers, json=body)
+
+        def fetch():
+            response = get_session().post(SERPER_URL, headers=headers, json=body)
+            raise_for_outage(response)
             data = response.json()
             if "error" in data:
-                return f"Serper error: {data['error']}"
-            results = data.get("organic", [])
-            if not results:
-                return "No relevant results found."
-            summary = "\n\n".join([f"- {r['title']} - {r['snippet']}" for r in results[:3]])
-            return f"Top results:\n\n{summary}"
-        except Exception as e:
-            return f"Error calling Serper: {e}"
+                raise SerperError(data["error"])
+            return data.get("organic", [])
+
+        try:
+            results = SerperSearchTool._cached("serper.search", normalize_query(query),
+                                               lambda: resilience.provider("serper").call(fetch), flight_key=coalesce_key(query))
+        except ProviderUnavailable:
+            fallback = SerperSearchTool._exa_fallback(query)
+            if fallback is None:
+                raise
+            results = [{"title": r["title"], "link": r["url"], "snippet": r["title"]} for r in fallback]
+        SerperSearchTool._remember("serper.search", [
+            {"url": r.get("link", ""), "title": r.get("title", ""), "content": r.get("snippet", "")} for r in results])
+        return [{"title": r.get("title", ""), "url": r.get("link", ""), "snippet": r.get("snippet", "")} for r in results]
 
     @classmethod
     def tools(cls):
         return [cls.search]
 
-class OsintAgentsSimplified():
-    def CoreInfo_agent(self):
-        return Agent(
-            role='OSINT Core Information Specialist',
-            goal='Gather fundamental information about the company, its online presence, and public perception.',
-            tools=SerperSearchTool.tools(),
-            backstory=dedent("""\
-                     You are a highly efficient OSINT Core Information Specialist. Your primary goal is to quickly gather the most crucial information about a given company. This includes its official website, a brief overview, key social media profiles, recent news, and general public sentiment. You prioritize speed and accuracy in identifying these core elements."""),
-            verbose=True,
-            llm=ollama_llm,
-            prompt=prompt_template,
-        )
+    @staticmethod
+    def _exa_fallback(query):
+        """Exa results for ``query`` while Serper is unavailable, or ``None``."""
+        if not (SEARCH_FALLBACK and os.getenv("EXA_API_KEY")):
+            return None
 
-    def TechnicalAndLegal_agent(self):
-        return Agent(
-            role='OSINT Technical and Legal Analyst',
-            goal='Investigate the company\'s technical infrastructure and identify any significant regulatory or legal information.',
-            tools=SerperSearchTool.tools(),
-            backstory=dedent("""\
-           You are a focused OSINT Technical and Legal Analyst. Your task is to efficiently investigate the technical aspects of a company's online presence, including its domain information and security posture. Additionally, you will look for any readily available information regarding regulatory filings or significant legal issues."""),
-            verbose=True,
-            llm=ollama_llm,
-            prompt=prompt_template,
-        )
+        def fetch():
+            results = get_exa().search(query, use_autoprompt=True, num_results=10).results
+            return [{"title": r.title, "url": r.url, "id": r.id} for r in results]
 
-    def ReportGenerator_agent(self):
-        return Agent(
-            role='OSINT Report Generator',
-            goal='Compile the gathered information into a concise and accurate OSINT report.',
-            tools=SerperSearchTool.tools(),
-            backstory=dedent("""\
-             You are the lead OSINT Report Generator. Your role is to take the key findings from the Core Information Specialist and the Technical and Legal Analyst and synthesize them into a concise yet informative OSINT report. Focus on presenting the most critical information clearly and accurately."""),
-            verbose=True,
-            llm=ollama_llm,
-            prompt=prompt_template,
-        )
+        try:
+            # Same cache entries as the terminal crew's Exa tool
+            results = SerperSearchTool._cached("exa.search", normalize_query(query),
+                                               lambda: resilience.provider("exa").call(fetch), flight_key=coalesce_key(query))
+        except Exception:  # the fallback is best effort; the caller reports the first provider's outage
+            return None
+        resilience.provider("serper").record_fallback()
+        return results
 
-class OsintAnalysisTaskSimplified():
-    def CoreInfo_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+    @staticmethod
+    def _remember(source, documents):
+        """Index gathered documents under the company and run the calling agent works for."""
+        run = tracer.current_run
+        if run is not None and documents:
+            doc_store.add(run.name, run.trace_id, source, documents)
+
+    @staticmethod
+    def _cached(namespace, key, fetch, flight_key=None):
+        """Serve a tool call from the cache, sharing identical in-flight calls, and trace it.
+
+        The span's ``cache_hit`` is False only for the call that actually hit the API.
+        """
+        with tracer.span("tool", namespace, key=key) as span:
+            span.attrs["cache_hit"] = True
+
+            def miss():
+                span.attrs["cache_hit"] = False
+                return fetch()
+
+            result = search_flight.do(
+                namespace + ":" + (flight_key or key),
+                lambda: search_cache.cached(namespace, key, miss))
+            span.attrs["payload_bytes"] = len(json.dumps(result))
+            return result
+
+class GatheredDocumentsTool:
+    @tool
+    @loop_controller.guard
+    def search_gathered(query: str) -> str:
+        """Search the results other agents already gathered about the company during this analysis.
+        Use this before searching the web: it is instant and makes no API calls.
+
+        Args:
+            query (str): What to look for
+
+        Returns:
+            str: The most relevant gathered passages
+        """
+        run = tracer.current_run
+        if run is None:
+            return "No gathered documents available."
+        return doc_store.retrieve(run.name, query, run_id=run.trace_id) or "Nothing relevant has been gathered yet."
+
+    @classmethod
+    def tools(cls):
+        return [cls.search_gathered]
+
+class DomainCollectorTool:
+    @tool
+    @loop_controller.guard
+    def collect_domain_facts(domain: str) -> str:
+        """Look up a domain directly: DNS records, WHOIS registration, TLS certificate and HTTP headers/technologies.
+        Use this instead of searching the web for whois, DNS or SSL details.
+
+        Args:
+            domain (str): The company's domain or website URL, e.g. example.com
+
+        Returns:
+            str: The collected facts, one line per lookup
+        """
+        domain = domain_from(domain)
+        if not domain or "." not in domain:
+            return f"Not a domain: {domain!r}"
+        facts = SerperSearchTool._cached("collector.domain", domain, lambda: DomainCollector().collect(domain))
+        return format_facts(facts)
+
+    @classmethod
+    def tools(cls):
+        return [cls.collect_domain_facts]
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Forwards each generated LLM token to the UI event queue."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        # Each agent iteration is a new generation; the UI shows only the latest one
+        self.events.put(("token_reset",))
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.events.put(("token", token))
+
+# Tool groups a section can ask for by name
+TOOLS = {
+    "serper": SerperSearchTool.tools,
+    "domain": DomainCollectorTool.tools,
+    "gathered": GatheredDocumentsTool.tools,
+}
+
+# Research sections; SECTION_PROFILE picks which of them the app runs
+SECTIONS = SectionRegistry([
+    SectionSpec(
+        "Core Information", "CoreInfo",
+        role='OSINT Core Information Specialist',
+        goal='Gather fundamental information about the company, its online presence, and public perception.',
+        backstory=dedent("""\
+                     You are a highly efficient OSINT Core Information Specialist. Your primary goal is to quickly gather the most crucial information about a given company. This includes its official website, a brief overview, key social media profiles, recent news, and general public sentiment. You prioritize speed and accuracy in identifying these core elements."""),
+        task=dedent("""\
                 Your primary task is to gather the most important foundational information about the company named {company}. Specifically, find and report:
                 - The official website URL.
                 - A brief overview or description of what the company does.
@@ -110,44 +275,179 @@ class OsintAnalysisTaskSimplified():
                 - A summary of any significant recent news articles (last 3-6 months).
                 - A general sense of public perception (e.g., recent customer reviews or mentions on forums).
                 Company Name: {company} """),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A concise report containing the company's website URL, a brief overview, links to main social media profiles, a summary of recent news, and a general overview of public perception."""),
-            async_execution=True,
-            agent=agent
-        )
-
-    def TechnicalAndLegal_task(self, agent, company):
-        return Task(
-            description=dedent(f"""\
+        tools=["serper"],
+    ),
+    SectionSpec(
+        "Technical and Legal", "TechnicalAndLegal",
+        role='OSINT Technical and Legal Analyst',
+        goal='Investigate the company\'s technical infrastructure and identify any significant regulatory or legal information.',
+        backstory=dedent("""\
+           You are a focused OSINT Technical and Legal Analyst. Your task is to efficiently investigate the technical aspects of a company's online presence, including its domain information and security posture. Additionally, you will look for any readily available information regarding regulatory filings or significant legal issues."""),
+        task=dedent("""\
                 Your task is to investigate the technical and legal aspects of the company named {company}. Focus on:
+                - Finding the company's domain and running the `collect_domain_facts` tool on it, which returns its DNS, WHOIS, TLS and HTTP details directly.
                 - Finding the domain registration details (WHOIS information).
                 - Briefly assessing the security of their website (e.g., presence of SSL certificate).
                 - Identifying any readily available information about significant regulatory filings or major legal issues the company might be facing.
                 Company Name: {company}"""),
-            expected_output=dedent("""\
+        expected_output=dedent("""\
                 A report summarizing the domain registration details, a brief note on website security, and any identified significant regulatory or legal information."""),
+        tools=["domain", "serper"],
+    ),
+], profiles={
+    "quick": ["Core Information"],
+    "network-only": ["Technical and Legal"],
+})
+
+class OsintAgentsSimplified():
+    def section_agent(self, spec):
+        return Agent(
+            role=spec.role,
+            goal=spec.goal,
+            tools=[t for group in spec.tools for t in TOOLS[group]()],
+            backstory=spec.backstory,
+            verbose=True,
+            llm=agent_llm(spec.agent_name),
+            prompt=prompt_template,
+        )
+
+    def ReportGenerator_agent(self, specs, llm=None):
+        return Agent(
+            role='OSINT Report Generator',
+            goal='Compile the gathered information into a concise and accurate OSINT report.',
+            tools=GatheredDocumentsTool.tools() + SerperSearchTool.tools(),
+            backstory=dedent(f"""\
+             You are the lead OSINT Report Generator. Your role is to take the key findings from the {' and the '.join(spec.role for spec in specs)} and synthesize them into a concise yet informative OSINT report. Focus on presenting the most critical information clearly and accurately."""),
+            verbose=True,
+            llm=llm or agent_llm("ReportGenerator_agent"),
+            prompt=prompt_template,
+        )
+
+class OsintAnalysisTaskSimplified():
+    def section_task(self, spec, agent, company, callback=None):
+        return Task(
+            description=spec.task.format(company=company),
+            expected_output=spec.expected_output + output_format(spec.title),
             async_execution=True,
-            agent=agent
+            agent=agent,
+            callback=callback
         )
 
-    def ReportGenerator_task(self, agent, company):
+    def ReportGenerator_task(self, agent, company, specs, callback=None):
+        covered = "\n".join(f"- {spec.title}: {spec.expected_output}" for spec in specs)
         return Task(
             description=dedent(f"""\
-            Your final task is to compile the information gathered by the OSINT Core Information Specialist and the OSINT Technical and Legal Analyst into a concise and accurate OSINT report for the company named {company}. Ensure the report includes:
-            - A brief overview of the company.
-            - The official website URL.
-            - Links to main social media profiles.
-            - A summary of recent news.
-            - General public perception.
-            - Domain registration details.
-            - A note on website security.
-            - Any identified significant regulatory or legal information.
+            Your final task is to compile the information gathered by the {' and the '.join(spec.role for spec in specs)} into a concise and accurate OSINT report for the company named {company}. Ensure the report covers:
+            """) + covered + dedent(f"""
+            Everything the other agents found is indexed: use the `search_gathered` tool to look it up before searching the web.
             Company Name: {company}"""),
             expected_output=dedent("""\
                 A concise and accurate OSINT report summarizing the key findings across all investigated areas."""),
-            agent=agent
+            agent=agent,
+            callback=callback
         )
 
+def run_analysis(company, events=None, run_id=None, profile=None):
+    """Run the simplified crew for one company and return its report.
+
+    Only the sections of ``profile`` (default ``SECTION_PROFILE``) are run. When an
+    ``events`` queue is given, each research section is pushed to it as soon as its
+    task completes, followed by the report generator's tokens as they stream.
+    Task outputs are checkpointed; the company's latest unfinished run (or ``run_id``)
+    is resumed, with the sections it was started with, unless ``UI_RESUME=0``.
+    """
+    resume = os.getenv("UI_RESUME", "1").lower() not in ("0", "false", "no")
+    checkpoint = (Checkpoint(run_id=run_id) if run_id else Checkpoint.latest(company) if resume else None) or Checkpoint(company)
+    if checkpoint.finished:
+        return checkpoint.load("report")
+    specs = SECTIONS.select(profile, checkpoint.load("sections"))
+    checkpoint.save("sections", [spec.title for spec in specs])
+    with tracer.run(checkpoint.company, run_id=checkpoint.run_id) as run:
+        report = _run_crew(checkpoint.company, events, checkpoint, specs)
+    tracer.export(run.trace_id)
+    checkpoint.finish(report)
+    try:
+        warehouse.record(checkpoint, tracer.trace_spans(run.trace_id), doc_store.documents(checkpoint.company, run.trace_id))
+    except Exception as e:  # the report is already saved; the warehouse copy can be re-imported later
+        if events is not None:
+            events.put(("warning", f"Could not record run {checkpoint.run_id} in the warehouse: {e}"))
+    if events is not None:
+        events.put(("trace", tracer.summary(run.trace_id) + "\n\n" + loop_controller.summary(run.trace_id)))
+    tracer.prune()
+    loop_controller.prune()
+    return report
+
+def _run_crew(company, events, checkpoint, specs):
+    register_company(company)
+    tasks = OsintAnalysisTaskSimplified()
+    agents = OsintAgentsSimplified()
+    sections = SectionOutputs()
+
+    def show_section(title, text):
+        if events is not None:
+            events.put(("section", title, text if REPORT_MODE == "llm" else render_section_markdown(title, parse_section(title, text))))
+
+    def section_callback(title):
+        return checkpoint.callback(title, then=sections.callback(title, then=lambda output: show_section(title, output.raw_output)))
+
+    # Create the selected sections' agents and tasks; sections saved by an earlier attempt of this run are not re-run
+    crew_agents, crew_tasks, restored = [], [], []
+    for spec in specs:
+        saved = checkpoint.load(spec.title)
+        if saved is not None:
+            sections.record(spec.title, saved)
+            restored.append(f"## {spec.title}\n{saved}")
+            show_section(spec.title, saved)
+            continue
+        agent = agents.section_agent(spec)
+        crew_agents.append(agent)
+        crew_tasks.append(tasks.section_task(spec, agent, company, callback=section_callback(spec.title)))
+
+    # Seed the research tasks with the canonical facts looked up concurrently up front
+    facts = Prefetcher.format(Prefetcher(SerperSearchTool._search).run(company)) if crew_tasks else ""
+    if facts:
+        for task in crew_tasks:
+            task.description += "\n\n" + facts
+
+    report_llm = agent_llm("ReportGenerator_agent", callbacks=[TokenStreamHandler(events)]) if events is not None else None
+    if REPORT_MODE != "llm":
+        # Render the report from the structured sections; the LLM only writes the optional summary
+        if crew_tasks:
+            crew_tasks[-1].async_execution = False
+            Crew(agents=crew_agents, tasks=crew_tasks, verbose=True).kickoff()
+        structured = checkpoint.load("structured sections")
+        if structured is None:
+            structured = parse_sections(sections.wait([spec.title for spec in specs], tasks=crew_tasks), llm=agent_llm("SectionParser"))
+            checkpoint.save("structured sections", structured)
+        summary = executive_summary(report_llm or agent_llm("ExecutiveSummary"), company, structured) if REPORT_SUMMARY else None
+        return render(company, structured, fmt="markdown", summary=summary)
+
+    report_generator_agent = agents.ReportGenerator_agent(specs, llm=report_llm)
+    report_generator_task = tasks.ReportGenerator_task(report_generator_agent, company, specs)
+    if restored:
+        report_generator_task.description += "\n\nFindings already gathered:\n\n" + "\n\n".join(restored)
+
+    # Create the crew
+    crew = Crew(
+        agents=crew_agents + [report_generator_agent],
+        tasks=crew_tasks + [report_generator_task],
+        verbose=True,
+    )
+
+    # Run the crew
+    return crew.kickoff()
+
+@st.cache_resource
+def get_job_queue():
+    """One job queue per Streamlit server, shared by every session."""
+    return JobQueue(
+        run_analysis,
+        workers=int(os.getenv("UI_WORKERS", 1)),
+        result_ttl=int(os.getenv("UI_RESULT_TTL", 3600)),
+    )
+
 if __name__ == "__main__":
     st.title("Simplified OSINT Analysis Tool")
     st.markdown("Enter the name of the company you want to analyze:")
@@ -155,45 +455,57 @@ if __name__ == "__main__":
     company = st.text_input("Company Name", "")
 
     if company:
-        with st.spinner(f"Analyzing {company}..."):
-            tasks = OsintAnalysisTaskSimplified()
-            agents = OsintAgentsSimplified()
-            serper_tool = SerperSearchTool()
-
-            # Instantiate agents with the bound Serper Search Tool
-            core_info_agent = agents.CoreInfo_agent()
-            core_info_agent.tools = [serper_tool.search]
-
-            technical_legal_agent = agents.TechnicalAndLegal_agent()
-            technical_legal_agent.tools = [serper_tool.search]
-
-            report_generator_agent = agents.ReportGenerator_agent()
-            report_generator_agent.tools = [serper_tool.search]
-
-            # Create tasks
-            core_info_task = tasks.CoreInfo_task(core_info_agent, company)
-            technical_legal_task = tasks.TechnicalAndLegal_task(technical_legal_agent, company)
-            report_generator_task = tasks.ReportGenerator_task(report_generator_agent, company)
-
-            # Create the crew
-            crew = Crew(
-                agents=[
-                    core_info_agent,
-                    technical_legal_agent,
-                    report_generator_agent
-                ],
-                tasks=[
-                    core_info_task,
-                    technical_legal_task,
-                    report_generator_task
-                ],
-                verbose=True,
-                max_iterations=10
-            )
-
-            # Run the crew
-            report = crew.kickoff()
+        if "user_id" not in st.session_state:
+            st.session_state.user_id = uuid.uuid4().hex
 
+        # Reruns and other users asking for the same company attach to the existing job
+        jobs = get_job_queue()
+        job = jobs.submit(company, user=st.session_state.user_id)
+
+        status = st.empty()
+        sections = st.container()
         st.subheader("OSINT Analysis Report:")
-        st.write(report)
-        st.success("OSINT analysis complete!")
\ No newline at end of file
+        report_placeholder = st.empty()
+        streamed = ""
+        trace_summary = None
+        seen = 0
+        with st.spinner(f"Analyzing {company}..."):
+            while True:
+                events = job.wait_events(seen, timeout=1.0)
+                seen += len(events)
+                for kind, *payload in events:
+                    if kind == "section":
+                        title, text = payload
+                        with sections.expander(title, expanded=True):
+                            st.markdown(text)
+                    elif kind == "token_reset":
+                        streamed = ""
+                    elif kind == "token":
+                        streamed += payload[0]
+                        report_placeholder.markdown(streamed)
+                    elif kind == "trace":
+                        trace_summary = payload[0]
+                    elif kind == "warning":
+                        st.warning(payload[0])
+                if job.finished and seen >= len(job.events):
+                    break
+                if job.status == "queued":
+                    status.info(f"Waiting for a free worker ({jobs.position(job)} analyses ahead)...")
+                else:
+                    status.empty()
+
+        status.empty()
+        if job.status == "error":
+            st.error(f"OSINT analysis failed: {job.error}")
+        else:
+            report_placeholder.write(job.result)
+            st.success("OSINT analysis complete!")
+        st.caption(f"Search cache: {search_cache.stats()} · Coalesced searches: {search_flight.stats()}"
+                   f" · Duplicate results dropped: {deduplicator.stats()['dropped']}")
+        st.caption(f"LLM cache: {ollama_llm.cache.stats() if ollama_llm.cache else 'disabled'}"
+                   + (f" · LLM backends: {ollama_llm.pool.stats()}" if ollama_llm.pool else ""))
+        st.caption(f"Rate limiting: {rate_limit.stats()} · Jobs: {jobs.stats()}")
+        st.caption(f"Search providers: {resilience.stats()}")
+        if trace_summary:
+            with st.expander("Timing breakdown"):
+                st.code(trace_summary)
@@ -0,0 +1,341 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+from checkpoint import Checkpoint
+from dedup import canonical_url
+from report import parse_sections
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        company TEXT NOT NULL,
+        company_key TEXT NOT NULL,
+        day TEXT NOT NULL,
+        started_at REAL,
+        finished_at REAL NOT NULL,
+        latest INTEGER NOT NULL DEFAULT 0,
+        wall_s REAL,
+        llm_calls INTEGER,
+        tool_calls INTEGER,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        sections TEXT NOT NULL,
+        report TEXT)""",
+    "CREATE INDEX IF NOT EXISTS runs_company ON runs (company_key, finished_at)",
+    "CREATE INDEX IF NOT EXISTS runs_day ON runs (day)",
+    # Structured section data as validated against its schema in report.py
+    """CREATE TABLE IF NOT EXISTS sections (
+        run_id TEXT NOT NULL,
+        section TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (run_id, section))""",
+    # One row per field value (per item for list fields), keyed for cross-company lookups
+    """CREATE TABLE IF NOT EXISTS facts (
+        run_id TEXT NOT NULL,
+        section TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        value_key TEXT NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS facts_lookup ON facts (field, value_key, run_id)",
+    "CREATE INDEX IF NOT EXISTS facts_run ON facts (run_id)",
+    """CREATE TABLE IF NOT EXISTS sources (
+        run_id TEXT NOT NULL,
+        section TEXT,
+        url TEXT NOT NULL,
+        canonical TEXT NOT NULL,
+        title TEXT,
+        source TEXT,
+        fetched_at REAL)""",
+    "CREATE INDEX IF NOT EXISTS sources_canonical ON sources (canonical, run_id)",
+    "CREATE INDEX IF NOT EXISTS sources_run ON sources (run_id)",
+    """CREATE TABLE IF NOT EXISTS timings (
+        run_id TEXT NOT NULL,
+        agent TEXT NOT NULL,
+        seconds REAL,
+        llm_calls INTEGER,
+        tool_calls INTEGER,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER)""",
+    "CREATE INDEX IF NOT EXISTS timings_run ON timings (run_id)",
+]
+
+
+def company_key(company):
+    return " ".join(str(company or "").lower().split())
+
+
+def value_key(value):
+    """Comparable form of a fact: lower case, punctuation and spacing collapsed ("MarkMonitor, Inc." == "markmonitor inc")."""
+    return " ".join(re.sub(r"[^\w]+", " ", str(value).lower()).split())
+
+
+def _values(value):
+    """Fact values of a field: one per list item, dict items as "key: value; ..."."""
+    for item in value if isinstance(value, list) else [value]:
+        if isinstance(item, dict):
+            item = "; ".join(f"{k}: {v}" for k, v in item.items() if v not in (None, "", []))
+        if item not in (None, "", []):
+            yield str(item)
+
+
+def _canonical(url):
+    """``canonical_url`` of a cited URL, or the URL itself when it doesn't parse (e.g. a bad port)."""
+    try:
+        return canonical_url(url)
+    except ValueError:
+        return url
+
+
+class Warehouse:
+    """SQLite store of every finished analysis, for queries across companies.
+
+    Each run is recorded with its report, structured sections, one indexed row per
+    field value (``facts``), its sources (URL, title, fetch time) and per-agent
+    timings and token counts, so questions like "which companies share this
+    registrar" or "latest report for X" are index lookups instead of new crew runs.
+    Only each company's most recent run is considered by the lookups.
+    """
+
+    def __init__(self, path=None, enabled=None):
+        self.path = path or os.getenv("WAREHOUSE_PATH", os.path.join(".osint_cache", "warehouse.sqlite"))
+        if enabled is None:
+            enabled = os.getenv("WAREHOUSE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        if not enabled:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, checkpoint, trace=None, documents=None):
+        """Store a finished checkpointed run, replacing an earlier copy of it.
+
+        ``trace`` is the run's span records (``tracer.trace_spans(trace_id)``) and
+        ``documents`` what it gathered (``DocumentStore.documents``); runs imported
+        from old checkpoints have neither.
+        """
+        if not self.enabled:
+            return
+        meta = checkpoint.meta
+        titles = checkpoint.load("sections") or []
+        sections = checkpoint.load("structured sections")
+        if sections is None:
+            # Report-generator runs: the agents still answered in each section's JSON format
+            outputs = {title: checkpoint.load(title) for title in titles}
+            sections = parse_sections({t: text for t, text in outputs.items() if text is not None})
+        finished = meta.get("finished_at") or time.time()
+        agents = [r for r in trace or [] if r["kind"] == "agent"]
+        llm = [r for r in trace or [] if r["kind"] == "llm"]
+        run_span = next((r for r in trace or [] if r["kind"] == "run"), None)
+        key = company_key(meta["company"])
+        with self._connect() as conn:
+            for table in ("runs", "sections", "facts", "sources", "timings"):
+                conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (checkpoint.run_id,))
+            conn.execute(
+                "INSERT INTO runs (run_id, company, company_key, day, started_at, finished_at, wall_s, llm_calls,"
+                " tool_calls, prompt_tokens, completion_tokens, sections, report) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (checkpoint.run_id, meta["company"], key, time.strftime("%Y-%m-%d", time.localtime(finished)),
+                 meta.get("created_at"), finished, run_span["duration_s"] if run_span else None,
+                 len(llm) if trace else None, sum(1 for r in trace or [] if r["kind"] == "tool") if trace else None,
+                 sum(r["attrs"].get("prompt_tokens", 0) for r in llm) if trace else None,
+                 sum(r["attrs"].get("completion_tokens", 0) for r in llm) if trace else None,
+                 json.dumps(list(sections) or titles), checkpoint.load("report")))
+            for section, data in sections.items():
+                conn.execute("INSERT INTO sections VALUES (?, ?, ?)",
+                             (checkpoint.run_id, section, json.dumps(data, ensure_ascii=False)))
+                conn.executemany("INSERT INTO facts VALUES (?, ?, ?, ?, ?)", [
+                    (checkpoint.run_id, section, field, value, value_key(value))
+                    for field, field_value in data.items() if field not in ("notes", "sources")
+                    for value in _values(field_value)])
+                conn.executemany("INSERT INTO sources (run_id, section, url, canonical) VALUES (?, ?, ?, ?)",
+                                 [(checkpoint.run_id, section, str(url), _canonical(str(url)))
+                                  for url in data.get("sources") or [] if url])
+            conn.executemany(
+                "INSERT INTO sources (run_id, url, canonical, title, source, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(checkpoint.run_id, d["url"], _canonical(d["url"]), d["title"], d["source"], d["fetched_at"])
+                 for d in documents or [] if d.get("url")])
+            conn.executemany("INSERT INTO timings VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                (checkpoint.run_id, a["agent"], a["duration_s"], a["attrs"]["llm_calls"], a["attrs"]["tool_calls"],
+                 sum(r["attrs"].get("prompt_tokens", 0) for r in llm if r["agent"] == a["agent"]),
+                 sum(r["attrs"].get("completion_tokens", 0) for r in llm if r["agent"] == a["agent"]))
+                for a in agents])
+            conn.execute("UPDATE runs SET latest = (run_id = (SELECT run_id FROM runs WHERE company_key = ?"
+                         " ORDER BY finished_at DESC LIMIT 1)) WHERE company_key = ?", (key, key))
+
+    def import_checkpoints(self, root=None):
+        """Record every finished run under ``CHECKPOINT_DIR`` not in the warehouse yet."""
+        root = root or os.getenv("CHECKPOINT_DIR", os.path.join(".osint_cache", "runs"))
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT run_id FROM runs")}
+        imported = 0
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            if name in known or not os.path.exists(os.path.join(root, name, "meta.json")):
+                continue
+            checkpoint = Checkpoint(run_id=name, root=root)
+            if checkpoint.finished:
+                try:
+                    self.record(checkpoint)
+                except (ValueError, KeyError, TypeError, sqlite3.Error) as exc:
+                    print(f"Skipping run {name}: {exc}", file=sys.stderr)
+                    continue
+                imported += 1
+        return imported
+
+    def latest(self, company):
+        """The most recent run of ``company`` with its report and sections, or ``None``."""
+        with self._connect() as conn:
+            run = conn.execute("SELECT * FROM runs WHERE company_key = ? AND latest = 1", (company_key(company),)).fetchone()
+            if run is None:
+                return None
+            sections = {row["section"]: json.loads(row["data"]) for row in conn.execute(
+                "SELECT section, data FROM sections WHERE run_id = ?", (run["run_id"],))}
+        return dict(run, sections=sections)
+
+    def companies_with(self, field, value, section=None):
+        """Companies whose latest run has ``value`` for ``field`` (e.g. registrar)."""
+        query = ("SELECT DISTINCT r.company, r.run_id, f.section, f.value FROM facts f JOIN runs r USING (run_id)"
+                 " WHERE f.field = ? AND f.value_key = ? AND r.latest = 1")
+        args = [field, value_key(value)]
+        if section:
+            query += " AND f.section = ?"
+            args.append(section)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query + " ORDER BY r.company", args)]
+
+    def shared(self, field, section=None, min_companies=2, limit=50):
+        """Values of ``field`` shared by at least ``min_companies`` companies, most shared first."""
+        query = ("SELECT MIN(f.value) AS value, COUNT(DISTINCT r.company_key) AS companies,"
+                 " GROUP_CONCAT(DISTINCT r.company) AS names FROM facts f JOIN runs r USING (run_id)"
+                 " WHERE f.field = ? AND r.latest = 1")
+        args = [field]
+        if section:
+            query += " AND f.section = ?"
+            args.append(section)
+        query += " GROUP BY f.value_key HAVING companies >= ? ORDER BY companies DESC, value LIMIT ?"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, args + [min_companies, limit])]
+
+    def citing(self, url):
+        """Companies whose latest run used ``url`` (or any page of its domain, given a bare domain)."""
+        canonical = _canonical(url)
+        query = ("SELECT r.company, r.run_id, COUNT(*) AS pages FROM sources s JOIN runs r USING (run_id)"
+                 " WHERE r.latest = 1 AND ")
+        if "/" in url.split("://")[-1]:
+            query, args = query + "s.canonical = ?", [canonical]
+        else:
+            query, args = query + "(s.canonical = ? OR s.canonical LIKE ?)", [canonical, canonical + "/%"]
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query + " GROUP BY r.run_id ORDER BY pages DESC", args)]
+
+    def runs(self, company=None, since=None, limit=50):
+        """Recorded runs, newest first, without their reports."""
+        query = ("SELECT run_id, company, day, finished_at, wall_s, llm_calls, tool_calls, prompt_tokens,"
+                 " completion_tokens, sections FROM runs WHERE 1 = 1")
+        args = []
+        if company:
+            query += " AND company_key = ?"
+            args.append(company_key(company))
+        if since:
+            query += " AND day >= ?"
+            args.append(since)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query + " ORDER BY finished_at DESC LIMIT ?", args + [limit])]
+
+    def fields(self):
+        """Field names with the number of companies that have a value for them."""
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT f.section, f.field, COUNT(DISTINCT r.company_key) AS companies FROM facts f"
+                " JOIN runs r USING (run_id) WHERE r.latest = 1 GROUP BY f.section, f.field ORDER BY f.section, f.field")]
+
+    def sql(self, query, args=()):
+        """Run a read-only SQL query against the warehouse."""
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(query, args)]
+        finally:
+            conn.close()
+
+
+def _print_rows(rows):
+    if not rows:
+        print("No results.")
+        return
+    columns = list(rows[0])
+    widths = {c: min(60, max(len(c), *(len(str(r[c])) for r in rows))) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c] if row[c] is not None else "")[:60].ljust(widths[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the analyses recorded in the OSINT warehouse")
+    parser.add_argument("--path", help="Warehouse database (default WAREHOUSE_PATH or .osint_cache/warehouse.sqlite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    latest = commands.add_parser("latest", help="Latest report for a company")
+    latest.add_argument("company")
+    latest.add_argument("--json", action="store_true", help="Print the structured sections instead of the report")
+    shared = commands.add_parser("shared", help="Companies sharing a field value, e.g. `shared registrar` or `shared registrar MarkMonitor`")
+    shared.add_argument("field")
+    shared.add_argument("value", nargs="?")
+    shared.add_argument("--section", help="Only this section's field")
+    citing = commands.add_parser("citing", help="Companies whose analysis used a URL or domain")
+    citing.add_argument("url")
+    runs = commands.add_parser("runs", help="Recorded runs, newest first")
+    runs.add_argument("--company")
+    runs.add_argument("--since", metavar="YYYY-MM-DD")
+    runs.add_argument("--limit", type=int, default=50)
+    commands.add_parser("fields", help="Fields that can be queried with `shared`")
+    sql = commands.add_parser("sql", help="Read-only SQL over runs, sections, facts, sources and timings")
+    sql.add_argument("query")
+    commands.add_parser("import", help="Record finished runs from the checkpoint directory")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.path, enabled=True)
+    started = time.perf_counter()
+    if args.command == "latest":
+        run = warehouse.latest(args.company)
+        if run is None:
+            sys.exit(f"No analysis of {args.company} recorded")
+        print(json.dumps(run["sections"], indent=2, ensure_ascii=False) if args.json else run["report"])
+        rows = [run]
+    elif args.command == "shared":
+        rows = (warehouse.companies_with(args.field, args.value, args.section) if args.value
+                else warehouse.shared(args.field, args.section))
+        _print_rows(rows)
+    elif args.command == "citing":
+        rows = warehouse.citing(args.url)
+        _print_rows(rows)
+    elif args.command == "runs":
+        rows = warehouse.runs(args.company, args.since, args.limit)
+        _print_rows(rows)
+    elif args.command == "fields":
+        rows = warehouse.fields()
+        _print_rows(rows)
+    elif args.command == "sql":
+        rows = warehouse.sql(args.query)
+        _print_rows(rows)
+    else:
+        rows = [None] * warehouse.import_checkpoints()
+        print(f"Imported {len(rows)} runs")
+    print(f"({len(rows)} rows in {(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)